@@ -3,21 +3,71 @@
 Copyright (c) 2019 - present AppSeed.us
 """
 
+import json
+import os
+
+import click
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from importlib import import_module
 
+from apps.assets import assets, precompress, send_static, write_manifest
+from apps.metrics import register_metrics
+from apps.profiler import profiler
+from apps.sampler import sampler
+from apps.templating import (
+    configure_bytecode_cache, fragments, precompile_templates
+)
+
 
 db = SQLAlchemy()
 
 
 def register_extensions(app):
     db.init_app(app)
+    sampler.configure(app)
+    profiler.init_app(app)
+
+    from apps.extensions import cache, compress, rate_limiter, view_cache
+    rate_limiter.init_app(app)
+    cache.init_app(app)
+    view_cache.init_app(app)
+    compress.init_app(app)
+
+    # Serve fingerprinted asset URLs and the .br/.gz files written by
+    # `flask precompress-static`
+    assets.init_app(app)
+    app.view_functions['static'] = send_static
+
+    configure_bytecode_cache(app)
+    fragments.init_app(app)
+
+
+def enabled_tools(app):
+    """Tool packages selected by the TOOLS / TOOLS_PROFILE manifest."""
+    tools = app.config.get('TOOLS')
+    if not tools:
+        profile = app.config.get('TOOLS_PROFILE', 'all')
+        try:
+            tools = app.config['TOOL_PROFILES'][profile]
+        except KeyError:
+            raise RuntimeError(
+                'Unknown TOOLS_PROFILE {!r}, expected one of {}'.format(
+                    profile, ', '.join(app.config['TOOL_PROFILES'])))
+    return tuple(tools)
 
 
 def register_blueprints(app):
-    module = import_module('apps.home.routes')
-    app.register_blueprint(module.blueprint)
+    tools = enabled_tools(app)
+    app.config['ENABLED_TOOLS'] = tools
+
+    for module_name in ('home', 'admin') + tools:
+        module = import_module('apps.{}.routes'.format(module_name))
+        app.register_blueprint(module.blueprint)
+
+    @app.context_processor
+    def inject_enabled_tools():
+        return dict(enabled_tools=tools)
 
 
 def configure_database(app):
@@ -31,10 +81,84 @@ def configure_database(app):
         db.session.remove()
 
 
+def register_commands(app):
+
+    @app.cli.command('import-report')
+    @click.option('--json', 'as_json', is_flag=True,
+                  help='Print the raw report as JSON.')
+    @click.option('--module', 'modules', multiple=True,
+                  help='Only measure these modules (repeatable).')
+    def import_report_command(as_json, modules):
+        """Cold import time and RSS cost of each lazy tool dependency."""
+        from apps import lazy
+
+        report = lazy.import_report(
+            modules=list(modules) or None,
+            boot_code=(
+                'from apps import create_app; '
+                'from apps.config import config_dict; '
+                'create_app(config_dict["Debug"])'
+            ),
+            path=os.path.dirname(app.root_path)
+        )
+
+        if as_json:
+            click.echo(json.dumps(report, indent=2))
+            return
+
+        rows = sorted(
+            report['modules'].items(),
+            key=lambda item: item[1]['seconds'] or 0,
+            reverse=True
+        )
+        click.echo('{:<28} {:>10} {:>10}  {}'.format(
+            'module', 'import ms', 'RSS MiB', 'status'))
+        for name, result in rows + [('<app boot>', report['boot'])]:
+            if result['seconds'] is None:
+                click.echo('{:<28} {:>10} {:>10}  {}'.format(
+                    name, '-', '-', result['error']))
+                continue
+            click.echo('{:<28} {:>10.1f} {:>10.1f}  {}'.format(
+                name,
+                result['seconds'] * 1000,
+                result['rss_bytes'] / 1048576,
+                result['error'] or 'ok'))
+
+
+    @app.cli.command('precompress-static')
+    @click.option('--min-size', default=256, show_default=True,
+                  help='Skip files smaller than this many bytes.')
+    @click.option('--gzip-only', is_flag=True,
+                  help='Do not write .br files (nginx without ngx_brotli).')
+    def precompress_static_command(min_size, gzip_only):
+        """Write .gz/.br variants of the compressible static files."""
+        files, original, totals = precompress(app.static_folder, min_size,
+                                              use_brotli=not gzip_only)
+        click.echo('{} files, {:.1f} MiB'.format(files, original / 1048576))
+        for suffix, total in totals.items():
+            click.echo('  {:<4} {:.1f} MiB ({:.0%})'.format(
+                suffix, total / 1048576, total / original if original else 0))
+
+    @app.cli.command('asset-manifest')
+    def asset_manifest_command():
+        """Write static/manifest.json with the content hash of every asset."""
+        manifest = write_manifest(app.static_folder)
+        click.echo('{} assets fingerprinted'.format(len(manifest)))
+
+    @app.cli.command('profiler-token')
+    def profiler_token_command():
+        """Print a signed X-Profile token for profiling requests."""
+        click.echo(profiler.make_token())
+
+
 def create_app(config):
     app = Flask(__name__)
     app.config.from_object(config)
     register_extensions(app)
     register_blueprints(app)
     configure_database(app)
-    return app
\ No newline at end of file
+    register_metrics(app)
+    register_commands(app)
+    if app.config.get('TEMPLATE_PRECOMPILE'):
+        precompile_templates(app)
+    return app
@@ -0,0 +1,12 @@
+# -*- encoding: utf-8 -*-
+"""
+Operator endpoints (profiler)
+"""
+
+from flask import Blueprint
+
+blueprint = Blueprint(
+    'admin_blueprint',
+    __name__,
+    url_prefix='/admin'
+)
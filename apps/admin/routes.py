@@ -0,0 +1,67 @@
+# -*- encoding: utf-8 -*-
+"""
+Operator endpoints (profiler)
+"""
+
+from flask import Response, abort, jsonify, request
+
+from apps.admin import blueprint
+from apps.profiler import TOKEN_HEADER, profiler
+
+
+@blueprint.before_request
+def require_token():
+    # Header only: a token in the query string ends up in access logs
+    token = request.headers.get(TOKEN_HEADER)
+    if not profiler.valid_token(token):
+        abort(403)
+
+
+@blueprint.route('/profiler', methods=['GET', 'POST'])
+def profiler_settings():
+    if request.method == 'POST':
+        try:
+            sample_rate = float(request.form.get('sample_rate', 0))
+            if not 0 <= sample_rate <= 1:
+                raise ValueError
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'sample_rate must be between 0 and 1'
+            }), 400
+        settings = profiler.store.update_settings(sample_rate=sample_rate)
+    else:
+        settings = dict(
+            {'sample_rate': profiler.default_sample_rate},
+            **profiler.store.settings()
+        )
+
+    return jsonify({
+        'success': True,
+        'data': settings
+    })
+
+
+@blueprint.route('/profiles')
+def list_profiles():
+    return jsonify({
+        'success': True,
+        'data': profiler.store.list()
+    })
+
+
+@blueprint.route('/profiles/<profile_id>')
+def get_profile(profile_id):
+    """Collapsed stacks, ready for flamegraph.pl or speedscope."""
+    try:
+        collapsed = profiler.store.load(profile_id)
+    except KeyError:
+        abort(404)
+    return Response(
+        collapsed,
+        mimetype='text/plain',
+        headers={
+            'Content-Disposition':
+                'attachment; filename={}.collapsed'.format(profile_id)
+        }
+    )
@@ -0,0 +1,234 @@
+# -*- encoding: utf-8 -*-
+"""
+Static asset build steps and serving.
+
+``flask precompress-static`` writes a ``.gz`` and (with the brotli package)
+a ``.br`` copy next to every compressible file in apps/static, once, at
+maximum compression (``--gzip-only``: no ``.br``, for stock nginx, which
+serves the ``.gz`` files directly; see the Dockerfile and
+nginx/appseed-app.conf). When the app serves /static itself, ``send_static`` picks the precompressed
+variant the client accepts instead of compressing on every request.
+
+Templates link assets through ``asset_url('assets/css/argon.css')``, which
+inserts a content hash into the file name (``argon.3f2a9c1b04de.css``).
+Fingerprinted URLs never change content, so they are served with a
+one-year immutable Cache-Control and browsers do not revalidate them. The
+hashes come from static/manifest.json (``flask asset-manifest``) or are
+computed on first use.
+"""
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import threading
+
+from flask import current_app, request, send_from_directory
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+COMPRESSIBLE = ('.css', '.js', '.map', '.svg', '.json', '.xml', '.txt',
+                '.html', '.ttf', '.eot', '.otf')
+
+# Variants in order of preference: (Content-Encoding, file suffix)
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def _compressors(use_brotli=True):
+    compressors = {'.gz': lambda data: gzip.compress(data, 9, mtime=0)}
+    if use_brotli and brotli is not None:
+        compressors['.br'] = lambda data: brotli.compress(
+            data, quality=11, mode=brotli.MODE_TEXT)
+    return compressors
+
+
+def precompress(directory, min_size=256, max_ratio=0.9, use_brotli=True):
+    """Write compressed variants of the files under ``directory``.
+
+    Variants that are up to date are skipped, and a variant is only kept
+    if it is at most ``max_ratio`` of the original size. Without
+    ``use_brotli`` only ``.gz`` files are written, for a server that
+    cannot serve ``.br`` (stock nginx). Returns
+    ``(files, original_bytes, {suffix: compressed_bytes})``.
+    """
+    compressors = _compressors(use_brotli)
+    files = original = 0
+    totals = dict.fromkeys(compressors, 0)
+
+    for root, _, names in os.walk(directory):
+        for name in names:
+            if not name.endswith(COMPRESSIBLE):
+                continue
+            path = os.path.join(root, name)
+            size = os.path.getsize(path)
+            if size < min_size:
+                continue
+
+            mtime = os.path.getmtime(path)
+            data = None
+            files += 1
+            original += size
+            for suffix, compress in compressors.items():
+                target = path + suffix
+                if os.path.exists(target) and os.path.getmtime(target) >= mtime:
+                    totals[suffix] += os.path.getsize(target)
+                    continue
+                if data is None:
+                    with open(path, 'rb') as source:
+                        data = source.read()
+                compressed = compress(data)
+                if len(compressed) > size * max_ratio:
+                    if os.path.exists(target):
+                        os.remove(target)
+                    totals[suffix] += size
+                    continue
+                with open(target + '.tmp', 'wb') as output:
+                    output.write(compressed)
+                os.replace(target + '.tmp', target)
+                totals[suffix] += len(compressed)
+
+    return files, original, totals
+
+
+MANIFEST_NAME = 'manifest.json'
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+# name.<12 hex digits>.ext
+_FINGERPRINTED = re.compile(r'^(?P<base>.+)\.(?P<hash>[0-9a-f]{12})(?P<ext>\.[^./]+)$')
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for chunk in iter(lambda: source.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+def fingerprint(name, digest):
+    base, ext = os.path.splitext(name)
+    return '{}.{}{}'.format(base, digest, ext)
+
+
+def build_manifest(static_folder):
+    """{logical name: content hash} of every file under ``static_folder``."""
+    manifest = {}
+    for root, _, names in os.walk(static_folder):
+        for name in names:
+            if name == MANIFEST_NAME or name.endswith(('.gz', '.br', '.tmp')):
+                continue
+            path = os.path.join(root, name)
+            logical = os.path.relpath(path, static_folder).replace(os.sep, '/')
+            manifest[logical] = file_hash(path)
+    return manifest
+
+
+def write_manifest(static_folder):
+    manifest = build_manifest(static_folder)
+    path = os.path.join(static_folder, MANIFEST_NAME)
+    with open(path + '.tmp', 'w') as output:
+        json.dump(manifest, output, indent=0, sort_keys=True)
+    os.replace(path + '.tmp', path)
+    return manifest
+
+
+class AssetManifest:
+    """Resolves logical asset names to fingerprinted static URLs."""
+
+    def __init__(self):
+        self.static_folder = None
+        self.reload = False
+        self._hashes = {}
+        self._mtimes = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.static_folder = app.static_folder
+        # Pick up edited assets while developing; the manifest is only
+        # trusted when files cannot change underneath it
+        self.reload = bool(app.debug or app.config.get('TEMPLATES_AUTO_RELOAD'))
+        if not self.reload:
+            try:
+                with open(os.path.join(self.static_folder, MANIFEST_NAME)) as f:
+                    self._hashes = json.load(f)
+            except (OSError, ValueError):
+                self._hashes = {}
+        app.add_template_global(self.url, 'asset_url')
+
+    def hash(self, name):
+        """Content hash of a static file, or None if it does not exist."""
+        if not self.reload and name in self._hashes:
+            return self._hashes[name]
+
+        path = safe_join(self.static_folder, name)
+        try:
+            mtime = os.path.getmtime(path)
+        except (OSError, TypeError):  # TypeError: unsafe path
+            return None
+        with self._lock:
+            if self._mtimes.get(name) != mtime or name not in self._hashes:
+                self._hashes[name] = file_hash(path)
+                self._mtimes[name] = mtime
+            return self._hashes[name]
+
+    def url(self, name):
+        """``asset_url('assets/css/argon.css')`` in templates."""
+        name = name.lstrip('/')
+        digest = self.hash(name)
+        if digest is None:
+            return '/static/' + name
+        return '/static/' + fingerprint(name, digest)
+
+    def resolve(self, filename):
+        """(real file name, immutable?) for a requested static file name."""
+        match = _FINGERPRINTED.match(filename)
+        if match:
+            name = match.group('base') + match.group('ext')
+            digest = self.hash(name)
+            if digest is not None:
+                # A stale hash (a page rendered before a deploy) still gets
+                # the file, just not cached forever
+                return name, digest == match.group('hash')
+        return filename, False
+
+
+assets = AssetManifest()
+
+
+def send_static(filename):
+    """Replacement for Flask's static view: resolves fingerprinted names and
+    serves precompressed variants."""
+    static_folder = current_app.static_folder
+    filename, immutable = assets.resolve(filename)
+    accepted = request.accept_encodings
+
+    response = None
+    for encoding, suffix in ENCODINGS:
+        if not accepted[encoding]:
+            continue
+        if not os.path.isfile(os.path.join(static_folder, filename + suffix)):
+            continue
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        response = send_from_directory(
+            static_folder, filename + suffix,
+            mimetype=mimetype,
+            max_age=current_app.get_send_file_max_age(filename)
+        )
+        response.headers['Content-Encoding'] = encoding
+        break
+
+    if response is None:
+        response = send_from_directory(
+            static_folder, filename,
+            max_age=current_app.get_send_file_max_age(filename)
+        )
+    response.vary.add('Accept-Encoding')
+    if immutable:
+        response.headers['Cache-Control'] = IMMUTABLE
+    return response
@@ -7,6 +7,8 @@ import os
 import hashlib
 import binascii
 
+from apps.metrics import observe
+
 # Inspiration -> https://www.vitoshacademy.com/hashing-passwords-in-python/
 
 
@@ -26,9 +28,10 @@ def verify_pass(provided_password, stored_password):
     stored_password = stored_password.decode('ascii')
     salt = stored_password[:64]
     stored_password = stored_password[64:]
-    pwdhash = hashlib.pbkdf2_hmac('sha512',
-                                  provided_password.encode('utf-8'),
-                                  salt.encode('ascii'),
-                                  100000)
+    with observe('pbkdf2_verify'):
+        pwdhash = hashlib.pbkdf2_hmac('sha512',
+                                      provided_password.encode('utf-8'),
+                                      salt.encode('ascii'),
+                                      100000)
     pwdhash = binascii.hexlify(pwdhash).decode('ascii')
     return pwdhash == stored_password
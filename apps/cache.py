@@ -0,0 +1,208 @@
+# -*- encoding: utf-8 -*-
+"""
+Two-tier response cache for the tool views.
+
+Keys are a hash of the endpoint and the canonicalised request inputs (view
+arguments, query string, form fields and JSON body), so POST tools can be
+cached too. A small in-process LRU answers repeated requests without a
+network hop; misses fall through to the shared Flask-Caching backend
+(Redis in production, see CACHE_TYPE). Only one thread per process, and
+with a backend that supports ``add``, one worker across processes,
+computes a missing key while the others wait for its result.
+"""
+
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import OrderedDict
+
+from flask import make_response, request
+
+from apps.metrics import CACHE_REQUESTS
+
+_MISSING = object()
+# Compute the value: this worker holds the cross-process lock
+_LOCKED = object()
+
+
+class LRUCache:
+    """Thread-safe, size-bounded LRU whose entries also expire."""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return _MISSING
+            value, expires = entry
+            if expires <= time.monotonic():
+                del self._data[key]
+                return _MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        if self.maxsize <= 0 or ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+def request_key(prefix='view'):
+    """Stable key for the current request's endpoint and inputs."""
+    inputs = {
+        'method': request.method,
+        'view_args': request.view_args or {},
+        'args': sorted((k, request.args.getlist(k)) for k in request.args),
+        'form': sorted((k, request.form.getlist(k)) for k in request.form),
+        'json': request.get_json(silent=True) if request.is_json else None
+    }
+    digest = hashlib.sha256(json.dumps(
+        inputs, sort_keys=True, separators=(',', ':'), default=str
+    ).encode()).hexdigest()
+    return '{}:{}:{}'.format(prefix, request.endpoint, digest)
+
+
+class TwoTierCache:
+
+    def __init__(self, shared):
+        self.shared = shared
+        self.local = LRUCache()
+        self.local_ttl = 30
+        self.jitter = 0.1
+        self.lock_timeout = 10
+        self._computing = {}
+        self._computing_lock = threading.Lock()
+
+    def init_app(self, app):
+        self.local = LRUCache(app.config.get('CACHE_LOCAL_MAXSIZE', 1024))
+        self.local_ttl = app.config.get('CACHE_LOCAL_TTL', self.local_ttl)
+        self.jitter = app.config.get('CACHE_TTL_JITTER', self.jitter)
+        self.lock_timeout = app.config.get('CACHE_LOCK_TIMEOUT', self.lock_timeout)
+
+    def _ttl(self, timeout):
+        # Spread the expiry of entries written together over the last
+        # ``jitter`` fraction of their lifetime
+        return timeout * (1 - random.uniform(0, self.jitter))
+
+    def _key_lock(self, key):
+        with self._computing_lock:
+            lock = self._computing.get(key)
+            if lock is None:
+                lock = self._computing[key] = [threading.Lock(), 0]
+            lock[1] += 1
+            return lock
+
+    def _release_key_lock(self, key, lock):
+        with self._computing_lock:
+            lock[1] -= 1
+            if not lock[1]:
+                del self._computing[key]
+
+    def _shared_get(self, key):
+        value = self.shared.get(key)
+        return _MISSING if value is None else value
+
+    def get_or_compute(self, key, compute, timeout, endpoint=None):
+        """Cached value for ``key``, computing it at most once at a time."""
+        value = self.local.get(key)
+        if value is not _MISSING:
+            CACHE_REQUESTS.labels(endpoint, 'local_hit').inc()
+            return value
+
+        lock = self._key_lock(key)
+        try:
+            with lock[0]:
+                # Whoever held the lock may have filled the cache meanwhile
+                value = self.local.get(key)
+                if value is not _MISSING:
+                    CACHE_REQUESTS.labels(endpoint, 'local_hit').inc()
+                    return value
+
+                value = self._shared_get(key)
+                if value is not _MISSING:
+                    CACHE_REQUESTS.labels(endpoint, 'shared_hit').inc()
+                    self.local.set(key, value, min(self.local_ttl, timeout))
+                    return value
+
+                value = self._wait_for_other_worker(key)
+                if value is not _MISSING and value is not _LOCKED:
+                    CACHE_REQUESTS.labels(endpoint, 'shared_hit').inc()
+                    self.local.set(key, value, min(self.local_ttl, timeout))
+                    return value
+
+                locked = value is _LOCKED
+                CACHE_REQUESTS.labels(endpoint, 'miss').inc()
+                try:
+                    value = compute()
+                    if value is not None:
+                        ttl = self._ttl(timeout)
+                        self.shared.set(key, value, timeout=max(1, int(ttl)))
+                        self.local.set(key, value, min(self.local_ttl, ttl))
+                finally:
+                    if locked:
+                        self.shared.delete(key + ':lock')
+                return value
+        finally:
+            self._release_key_lock(key, lock)
+
+    def _wait_for_other_worker(self, key):
+        """Take the cross-process compute lock, or wait for its holder's
+        result. Returns the value, _LOCKED if this worker took the lock, or
+        _MISSING if it should compute without it."""
+        lock = key + ':lock'
+        try:
+            if self.shared.add(lock, 1, timeout=self.lock_timeout):
+                return _LOCKED
+        except Exception:
+            return _MISSING
+
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            value = self._shared_get(key)
+            if value is not _MISSING:
+                return value
+            # Released without a value: the response was not cacheable
+            try:
+                if not self.shared.has(lock):
+                    return _MISSING
+            except Exception:
+                return _MISSING
+        return _MISSING
+
+    def clear(self):
+        self.local.clear()
+        self.shared.clear()
+
+
+def freeze_response(rv):
+    """Picklable form of a successful view result, or None if it should
+    not be cached."""
+    response = make_response(rv)
+    if (response.status_code != 200 or response.is_streamed
+            or 'Set-Cookie' in response.headers):
+        return None
+    return (response.get_data(), response.status_code,
+            [(k, v) for k, v in response.headers if k != 'Content-Length'])
+
+
+def thaw_response(frozen):
+    body, status, headers = frozen
+    return make_response(body, status, headers)
@@ -3,8 +3,9 @@
 Copyright (c) 2019 - present AppSeed.us
 """
 
+import json
 import os
-from decouple import config
+from decouple import config, Csv
 
 class Config(object):
 
@@ -17,6 +18,125 @@ class Config(object):
     SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(basedir, 'db.sqlite3')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Tool manifest: blueprint packages (apps/<tool>) registered at startup.
+    # Tools that are not enabled are never imported.
+    TOOL_PROFILES = {
+        'all': (
+            'dashboard', 'salary', 'vehicle_import', 'currency',
+            'qr_generator', 'hash_calculator',
+            'public_ip', 'dns_lookup', 'speed_test'
+        ),
+        'calculators': (
+            'dashboard', 'salary', 'vehicle_import', 'currency'
+        ),
+        'utilities': (
+            'qr_generator', 'hash_calculator'
+        ),
+        'network': (
+            'public_ip', 'dns_lookup', 'speed_test'
+        )
+    }
+
+    # Pick a profile per node type, or list the tools explicitly
+    # e.g. TOOLS=salary,currency (takes precedence over TOOLS_PROFILE)
+    TOOLS_PROFILE = config('TOOLS_PROFILE', default='all')
+    TOOLS = config('TOOLS', default='', cast=Csv())
+
+    # Seconds between two readings of the background metrics sampler
+    METRICS_SAMPLE_INTERVAL = config('METRICS_SAMPLE_INTERVAL', default=2.0, cast=float)
+
+    # Dashboard metrics streams (/ws/dashboard): seconds before a stream
+    # ends and the browser reconnects, and most open streams per worker
+    # process (0: no limit, for gevent workers). Beyond that the dashboard
+    # polls, so streams never take all the threads of a gthread worker
+    DASHBOARD_STREAM_MAX_AGE = config('DASHBOARD_STREAM_MAX_AGE', default=60, cast=float)
+    DASHBOARD_MAX_STREAMS = config('DASHBOARD_MAX_STREAMS', default=2, cast=int)
+
+    # Expose Prometheus metrics on /metrics
+    METRICS_ENDPOINT_ENABLED = config('METRICS_ENDPOINT_ENABLED', default=True, cast=bool)
+
+    # /readyz: checks that must pass, how long their result is cached and
+    # the usage percentage above which a resource is reported as 'high'
+    READINESS_CHECKS = config('READINESS_CHECKS', default='database,redis,sampler', cast=Csv())
+    HEALTH_CACHE_SECONDS = config('HEALTH_CACHE_SECONDS', default=5.0, cast=float)
+    HEALTH_RESOURCE_THRESHOLD = config('HEALTH_RESOURCE_THRESHOLD', default=80, cast=float)
+    HEALTH_CHECK_TIMEOUT = config('HEALTH_CHECK_TIMEOUT', default=1.0, cast=float)
+
+    # Rate limiting backend: 'redis' (shared by every host) or 'memory'
+    # (a memory-mapped file shared by the workers of this host, no Redis
+    # needed; the redis readiness check is then skipped)
+    RATELIMIT_BACKEND = config('RATELIMIT_BACKEND', default='redis')
+    RATELIMIT_SHM_PATH = config('RATELIMIT_SHM_PATH', default='')
+    RATELIMIT_SHM_SLOTS = config('RATELIMIT_SHM_SLOTS', default=65536, cast=int)
+
+    # View cache (apps/cache.py): the shared tier is Flask-Caching, e.g.
+    # CACHE_TYPE=RedisCache with CACHE_REDIS_URL; NullCache leaves only the
+    # per-process LRU
+    CACHE_TYPE = config('CACHE_TYPE', default='NullCache')
+    CACHE_REDIS_URL = config('CACHE_REDIS_URL', default='redis://localhost:6379/0')
+    CACHE_LOCAL_MAXSIZE = config('CACHE_LOCAL_MAXSIZE', default=1024, cast=int)
+    CACHE_LOCAL_TTL = config('CACHE_LOCAL_TTL', default=30, cast=float)
+    CACHE_TTL_JITTER = config('CACHE_TTL_JITTER', default=0.1, cast=float)
+    CACHE_LOCK_TIMEOUT = config('CACHE_LOCK_TIMEOUT', default=10, cast=float)
+
+    # Cache-Control per endpoint, overriding the policy set on the route,
+    # as JSON: {"currency_blueprint.get_exchange_rates": "public, max-age=60"}
+    HTTP_CACHE_CONTROL = config('HTTP_CACHE_CONTROL', default='{}', cast=json.loads)
+
+    # Response compression (Flask-Compress); static files are precompressed
+    # by `flask precompress-static` instead
+    COMPRESS_MIMETYPES = ['text/html', 'text/plain', 'text/xml', 'application/json',
+                          'application/xml', 'image/svg+xml']
+    COMPRESS_ALGORITHM = config('COMPRESS_ALGORITHM', default='br,gzip')
+    COMPRESS_MIN_SIZE = config('COMPRESS_MIN_SIZE', default=1024, cast=int)
+    COMPRESS_LEVEL = config('COMPRESS_LEVEL', default=6, cast=int)
+    COMPRESS_BR_LEVEL = config('COMPRESS_BR_LEVEL', default=4, cast=int)
+    COMPRESS_STREAMS = False
+
+    # Compiled templates shared by the workers of this host, in
+    # JINJA_BYTECODE_CACHE_DIR (empty: Jinja's per-user directory) which must
+    # be private to the user; and whether to compile all of them at startup
+    JINJA_BYTECODE_CACHE = config('JINJA_BYTECODE_CACHE', default=True, cast=bool)
+    JINJA_BYTECODE_CACHE_DIR = config('JINJA_BYTECODE_CACHE_DIR', default='')
+    TEMPLATE_PRECOMPILE = config('TEMPLATE_PRECOMPILE', default=False, cast=bool)
+
+    # Largest employee sheet accepted by /calculate-salary-batch
+    PAYROLL_MAX_ROWS = config('PAYROLL_MAX_ROWS', default=100000, cast=int)
+    # Most points (percentages x children x taxable flags) per salary sweep
+    SALARY_SWEEP_MAX_POINTS = config('SALARY_SWEEP_MAX_POINTS', default=10000, cast=int)
+
+    # Payslip PDFs: largest sheet per /payslips request and rendering
+    # processes per web worker (0: one per CPU). Each gunicorn worker keeps
+    # its own pool, so keep this small when running several workers
+    PAYSLIP_MAX_ROWS = config('PAYSLIP_MAX_ROWS', default=5000, cast=int)
+    PAYSLIP_WORKERS = config('PAYSLIP_WORKERS', default=1, cast=int)
+
+    # Vehicle import tariff schedules (default: vehicle_import/tariffs.json),
+    # checked for changes at most every TARIFF_RELOAD_INTERVAL seconds
+    VEHICLE_TARIFFS_PATH = config('VEHICLE_TARIFFS_PATH', default='')
+    TARIFF_RELOAD_INTERVAL = config('TARIFF_RELOAD_INTERVAL', default=1.0, cast=float)
+    # Most vehicles per /calculate-import-batch request
+    VEHICLE_BATCH_MAX_ROWS = config('VEHICLE_BATCH_MAX_ROWS', default=100000, cast=int)
+
+    # Exchange rates (see currency/rates.py): provider static, file, http
+    # or forex, refreshed in the background every RATES_REFRESH_INTERVAL
+    # seconds; the last good rates are kept in RATES_SNAPSHOT_PATH (empty:
+    # rates.json in the instance folder), in a directory private to the user
+    RATES_PROVIDER = config('RATES_PROVIDER', default='static')
+    RATES_PROVIDER_URL = config('RATES_PROVIDER_URL',
+                                default='https://open.er-api.com/v6/latest/USD')
+    RATES_FILE = config('RATES_FILE', default='')
+    RATES_REFRESH_INTERVAL = config('RATES_REFRESH_INTERVAL', default=3600, cast=int)
+    RATES_SNAPSHOT_PATH = config('RATES_SNAPSHOT_PATH', default='')
+
+    # Sampling profiler: fraction of requests profiled at random (requests
+    # with a signed X-Profile header are always profiled)
+    PROFILER_SAMPLE_RATE = config('PROFILER_SAMPLE_RATE', default=0.0, cast=float)
+    PROFILER_INTERVAL = config('PROFILER_INTERVAL', default=0.005, cast=float)
+    PROFILER_DIR = config('PROFILER_DIR', default=os.path.join(basedir, 'profiles'))
+    PROFILER_MAX_PROFILES = config('PROFILER_MAX_PROFILES', default=200, cast=int)
+    PROFILER_TOKEN_MAX_AGE = config('PROFILER_TOKEN_MAX_AGE', default=3600, cast=int)
+
 
 class ProductionConfig(Config):
     DEBUG = False
@@ -26,6 +146,8 @@ class ProductionConfig(Config):
     REMEMBER_COOKIE_HTTPONLY = True
     REMEMBER_COOKIE_DURATION = 3600
 
+    TEMPLATE_PRECOMPILE = config('TEMPLATE_PRECOMPILE', default=True, cast=bool)
+
     # PostgreSQL database
     SQLALCHEMY_DATABASE_URI = '{}://{}:{}@{}:{}/{}'.format(
         config('DB_ENGINE', default='postgresql'),
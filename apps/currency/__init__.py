@@ -0,0 +1,12 @@
+# -*- encoding: utf-8 -*-
+"""
+Currency converter
+"""
+
+from flask import Blueprint
+
+blueprint = Blueprint(
+    'currency_blueprint',
+    __name__,
+    url_prefix=''
+)
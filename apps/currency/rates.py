@@ -0,0 +1,279 @@
+# -*- encoding: utf-8 -*-
+"""
+Exchange rates, refreshed in the background.
+
+A provider fetches USD-based rates: ``static`` (the built-in sample rates),
+``file`` (a JSON file, for offline use and tests), ``http`` (any JSON API
+answering ``{"rates": {...}}``, open.er-api.com by default) or ``forex``
+(forex_python). Requests never call the provider. They read the snapshot
+held in memory by ``rates.snapshot()``:
+
+* the APScheduler job refreshes it every RATES_REFRESH_INTERVAL seconds;
+* a snapshot older than that is still served, while a refresh runs in a
+  background thread (stale-while-revalidate);
+* every good snapshot is written to RATES_SNAPSHOT_PATH (default: the
+  app's instance folder; the directory must be private), so new workers
+  start with the last rates and a worker finding a snapshot another worker
+  fetched recently adopts it instead of calling the provider again.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+
+from apps.lazy import lazy_import
+from apps.paths import UnsafeDirectoryError, private_directory
+
+requests = lazy_import('requests')
+forex_converter = lazy_import('forex_python.converter')
+
+logger = logging.getLogger(__name__)
+
+# Longest wait before a failed refresh is retried by a request
+RETRY_DELAY = 60
+
+# Used until a provider has answered once, and by the static provider
+SAMPLE_RATES = {
+    'USD': 1.0,
+    'EUR': 0.85,
+    'GBP': 0.73,
+    'GYD': 208.5,
+    'BBD': 2.0,
+    'TTD': 6.8,
+    'JMD': 154.5,
+    'BSD': 1.0,
+    'KYD': 0.82,
+    'XCD': 2.7,
+    'HTG': 98.5,
+    'CUP': 24.0,
+    'DOP': 56.8,
+    'BRL': 5.2,
+    'ARS': 98.4,
+    'CLP': 750.0,
+    'COP': 3750.0,
+    'PEN': 4.1,
+    'UYU': 44.2,
+    'VES': 4.1,
+    'BOB': 6.9,
+    'PYG': 6900.0,
+    'CAD': 1.25,
+    'MXN': 20.1,
+    'JPY': 110.2,
+    'CHF': 0.92,
+    'AUD': 1.35,
+    'NZD': 1.42,
+}
+
+# ``updated``: when the provider was asked (aware datetime)
+RateSnapshot = namedtuple('RateSnapshot', 'rates updated source')
+
+
+class RatesError(RuntimeError):
+    pass
+
+
+class StaticProvider:
+    name = 'static'
+
+    def __init__(self, rates=None):
+        self.rates = dict(rates or SAMPLE_RATES)
+
+    def fetch(self):
+        return dict(self.rates)
+
+
+class FileProvider:
+    """Rates from a JSON file: ``{"rates": {...}}`` or a bare mapping."""
+
+    name = 'file'
+
+    def __init__(self, path):
+        self.path = path
+
+    def fetch(self):
+        with open(self.path) as f:
+            data = json.load(f)
+        return data.get('rates', data)
+
+
+class HttpProvider:
+    name = 'http'
+
+    def __init__(self, url, timeout=10):
+        self.url = url
+        self.timeout = timeout
+
+    def fetch(self):
+        response = requests.get(self.url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()['rates']
+
+
+class ForexProvider:
+    name = 'forex'
+
+    def fetch(self):
+        return forex_converter.CurrencyRates().get_rates('USD')
+
+
+def make_provider(app):
+    name = app.config.get('RATES_PROVIDER', 'static')
+    if name == 'static':
+        return StaticProvider()
+    if name == 'file':
+        return FileProvider(app.config['RATES_FILE'])
+    if name == 'http':
+        return HttpProvider(app.config['RATES_PROVIDER_URL'])
+    if name == 'forex':
+        return ForexProvider()
+    raise RatesError('Unknown RATES_PROVIDER {!r}'.format(name))
+
+
+def _now():
+    return datetime.now(timezone.utc).replace(microsecond=0)
+
+
+class RateStore:
+    """The current RateSnapshot of this process."""
+
+    def __init__(self, provider=None, interval=3600, path=None, currencies=None):
+        self.provider = provider or StaticProvider()
+        self.interval = interval
+        self.path = path
+        # Rates outside this set are dropped (None: keep all)
+        self.currencies = currencies
+        self._snapshot = RateSnapshot(dict(SAMPLE_RATES), None, 'sample')
+        self._pid = None
+        self._attempted_at = None
+        self._start_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    def init_app(self, app, currencies=None):
+        self.provider = make_provider(app)
+        self.interval = app.config.get('RATES_REFRESH_INTERVAL', self.interval)
+        self.path = (app.config.get('RATES_SNAPSHOT_PATH') or
+                     os.path.join(app.instance_path, 'rates.json'))
+        self.currencies = currencies
+        self._pid = None
+        snapshot = self._read()
+        if snapshot is not None:
+            self._snapshot = snapshot
+
+    # Disk snapshot
+
+    def _read(self):
+        if not self.path:
+            return None
+        try:
+            private_directory(os.path.dirname(os.path.abspath(self.path)))
+            with open(self.path) as f:
+                if os.fstat(f.fileno()).st_uid != os.getuid():
+                    raise UnsafeDirectoryError('owned by another user')
+                data = json.load(f)
+            return RateSnapshot(data['rates'], datetime.fromisoformat(data['updated']),
+                                data['source'])
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError, UnsafeDirectoryError) as e:
+            logger.warning('Ignoring exchange rate snapshot %s: %s', self.path, e)
+            return None
+
+    def _write(self, snapshot):
+        if not self.path:
+            return
+        try:
+            private_directory(os.path.dirname(os.path.abspath(self.path)))
+            temporary = '{}.{}.tmp'.format(self.path, os.getpid())
+            with open(temporary, 'w') as f:
+                json.dump({'rates': snapshot.rates, 'updated': snapshot.updated.isoformat(),
+                           'source': snapshot.source}, f)
+            os.replace(temporary, self.path)
+        except (OSError, UnsafeDirectoryError) as e:
+            logger.warning('Could not save exchange rates to %s: %s', self.path, e)
+
+    # Refreshing
+
+    def age(self, snapshot=None):
+        """Seconds since ``snapshot`` (default: the current one) was fetched;
+        None for the built-in sample rates."""
+        snapshot = snapshot or self._snapshot
+        if snapshot.updated is None:
+            return None
+        return (_now() - snapshot.updated).total_seconds()
+
+    def is_stale(self, snapshot=None):
+        age = self.age(snapshot)
+        return age is None or age >= self.interval
+
+    def refresh(self):
+        """Fetch new rates unless a refresh is already running. Returns
+        whether the snapshot was replaced."""
+        if not self._refresh_lock.acquire(blocking=False):
+            return False
+        try:
+            self._attempted_at = time.monotonic()
+            # Another worker may have fetched them a moment ago
+            shared = self._read()
+            if shared is not None and not self.is_stale(shared):
+                if shared.updated != self._snapshot.updated:
+                    self._snapshot = shared
+                    return True
+                return False
+
+            try:
+                fetched = self.provider.fetch()
+                rates = {code: float(rate) for code, rate in fetched.items()
+                         if self.currencies is None or code in self.currencies}
+            except Exception as e:
+                logger.warning('Exchange rate refresh from %s failed, serving rates '
+                               'of %s: %s', self.provider.name,
+                               self._snapshot.updated or 'the sample table', e)
+                return False
+
+            # A provider without some currency keeps its previous rate
+            snapshot = RateSnapshot(dict(self._snapshot.rates, **rates), _now(),
+                                    self.provider.name)
+            self._snapshot = snapshot
+            self._write(snapshot)
+            return True
+        finally:
+            self._refresh_lock.release()
+
+    def _revalidate(self):
+        # A provider that is down is not asked again on every request
+        if self._refresh_lock.locked() or (
+                self._attempted_at is not None and
+                time.monotonic() - self._attempted_at < min(self.interval, RETRY_DELAY)):
+            return
+        threading.Thread(target=self.refresh, name='rates-refresh', daemon=True).start()
+
+    def start(self):
+        """Schedule the periodic refresh in this process (once per process,
+        also after a fork)."""
+        from apps.extensions import scheduler
+
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            scheduler.add_job(self.refresh, 'interval', seconds=self.interval,
+                              id='exchange-rates', replace_existing=True,
+                              coalesce=True, max_instances=1)
+            if not scheduler.running:
+                scheduler.start()
+
+    def snapshot(self):
+        """Current rates, without waiting for the provider."""
+        if self._pid != os.getpid():
+            self.start()
+        snapshot = self._snapshot
+        if self.is_stale(snapshot):
+            self._revalidate()
+        return snapshot
+
+
+rates = RateStore()
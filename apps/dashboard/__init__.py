@@ -0,0 +1,12 @@
+# -*- encoding: utf-8 -*-
+"""
+Dashboard page and system/analytics APIs
+"""
+
+from flask import Blueprint
+
+blueprint = Blueprint(
+    'dashboard_blueprint',
+    __name__,
+    url_prefix=''
+)
@@ -0,0 +1,345 @@
+# -*- encoding: utf-8 -*-
+"""
+Dashboard page and system/analytics APIs
+"""
+
+import platform
+import socket
+import sys
+from datetime import datetime, timedelta
+
+from flask import (
+    render_template, request, jsonify, Response, current_app,
+    stream_with_context
+)
+
+from apps.dashboard import blueprint
+from apps.dashboard.stream import broadcaster
+from apps.lazy import lazy_import
+from apps.sampler import resource_status, sampler
+from apps.timeseries import metrics_history, parse_duration
+
+user_agents = lazy_import('user_agents')
+
+# Keep a bounded history of every sampler reading for the dashboard charts
+# and push each reading to the connected dashboards
+sampler.subscribe(metrics_history.add)
+sampler.subscribe(broadcaster.publish)
+
+
+# Main Dashboard Route
+@blueprint.route('/')
+def dashboard():
+    try:
+        # Collect system information
+        system_info = {
+            'os': platform.system(),
+            'os_version': platform.version(),
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'python_version': sys.version,
+            'hostname': socket.gethostname()
+        }
+        
+        # Get usage statistics for tools
+        tool_stats = get_tool_usage_stats()
+        
+        return render_template(
+            'home/index.html',
+            segment='index',
+            system_info=system_info,
+            tool_stats=tool_stats
+        )
+    except Exception as e:
+        return render_template('home/index.html', segment='index', error=str(e))
+
+# System Information Routes
+@blueprint.route('/api/system-info')
+def get_system_info():
+    try:
+        snapshot = sampler.snapshot()
+
+        return jsonify({
+            'success': True,
+            'data': {
+                'cpu': snapshot['cpu'],
+                'memory': snapshot['memory'],
+                'disk': snapshot['disk'],
+                'network': snapshot['network']
+            }
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+# Tool Usage Statistics
+@blueprint.route('/api/tool-stats')
+def get_tool_usage_stats():
+    try:
+        # In a real application, you would get this from a database
+        # This is sample data for demonstration
+        stats = {
+            'calculators': {
+                'salary_calculator': 150,
+                'vehicle_import': 75,
+                'currency_converter': 200
+            },
+            'network_tools': {
+                'speed_test': 100,
+                'public_ip': 180,
+                'dns_lookup': 90
+            },
+            'utilities': {
+                'qr_generator': 120,
+                'hash_calculator': 80,
+                'json_formatter': 95
+            }
+        }
+        return jsonify({
+            'success': True,
+            'data': stats
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+# User Browser Information
+@blueprint.route('/api/browser-info')
+def get_browser_info():
+    try:
+        user_agent_string = request.headers.get('User-Agent')
+        user_agent = user_agents.parse(user_agent_string)
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'browser': {
+                    'family': user_agent.browser.family,
+                    'version': user_agent.browser.version_string
+                },
+                'os': {
+                    'family': user_agent.os.family,
+                    'version': user_agent.os.version_string
+                },
+                'device': {
+                    'family': user_agent.device.family,
+                    'brand': user_agent.device.brand,
+                    'model': user_agent.device.model
+                }
+            }
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+# Recent Activity Routes
+@blueprint.route('/api/recent-activity')
+def get_recent_activity():
+    try:
+        # In a real application, this would come from a database
+        # This is sample data for demonstration
+        activities = [
+            {
+                'tool': 'Currency Converter',
+                'action': 'Conversion performed',
+                'timestamp': datetime.now().isoformat(),
+                'details': 'USD to GYD conversion'
+            },
+            {
+                'tool': 'Speed Test',
+                'action': 'Test completed',
+                'timestamp': (datetime.now() - timedelta(minutes=5)).isoformat(),
+                'details': 'Download: 50Mbps, Upload: 25Mbps'
+            }
+            # Add more sample activities
+        ]
+        
+        return jsonify({
+            'success': True,
+            'data': activities
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+# System Health Check
+@blueprint.route('/api/health-check')
+def system_health_check():
+    try:
+        # Check system resources
+        snapshot = sampler.snapshot()
+        cpu_usage = snapshot['cpu']['usage_percent']
+        memory_usage = snapshot['memory']['percent']
+        disk_usage = snapshot['disk']['percent']
+        
+        # Define health status based on resource usage
+        health_status = resource_status(
+            snapshot, current_app.config.get('HEALTH_RESOURCE_THRESHOLD', 80)
+        )
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'status': health_status,
+                'metrics': {
+                    'cpu_usage': cpu_usage,
+                    'memory_usage': memory_usage,
+                    'disk_usage': disk_usage
+                },
+                'timestamp': snapshot['timestamp']
+            }
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+# Error Monitoring Route
+@blueprint.route('/api/error-logs')
+def get_error_logs():
+    try:
+        # In a real application, this would come from your logging system
+        # This is sample data for demonstration
+        error_logs = [
+            {
+                'timestamp': datetime.now().isoformat(),
+                'level': 'ERROR',
+                'message': 'Sample error message',
+                'source': 'System'
+            }
+            # Add more sample logs
+        ]
+        
+        return jsonify({
+            'success': True,
+            'data': error_logs
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+# Performance Metrics Route
+@blueprint.route('/api/performance-metrics')
+def get_performance_metrics():
+    try:
+        # Get system performance metrics
+        snapshot = sampler.snapshot()
+        metrics = {
+            'cpu': {
+                'usage': snapshot['cpu']['usage_percent'],
+                'frequency': snapshot['cpu']['frequency'],
+                'cores': snapshot['cpu']['cores']
+            },
+            'memory': snapshot['memory'],
+            'disk': {
+                'total': snapshot['disk']['total'],
+                'used': snapshot['disk']['used'],
+                'percent': snapshot['disk']['percent']
+            },
+            'network': {
+                'bytes_sent': snapshot['network']['bytes_sent'],
+                'bytes_recv': snapshot['network']['bytes_recv']
+            },
+            'timestamp': snapshot['timestamp']
+        }
+
+        # Optional history, e.g. ?range=1h&step=1m
+        if 'range' in request.args or 'step' in request.args:
+            try:
+                range_seconds = parse_duration(request.args.get('range', '1h'))
+                step = request.args.get('step')
+                step = parse_duration(step) if step else None
+            except ValueError as ve:
+                return jsonify({
+                    'success': False,
+                    'error': str(ve)
+                }), 400
+            metrics['history'] = metrics_history.query(range_seconds, step)
+        
+        return jsonify({
+            'success': True,
+            'data': metrics
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+# Tool Analytics Route
+@blueprint.route('/api/tool-analytics')
+def get_tool_analytics():
+    try:
+        # In a real application, this would come from your analytics system
+        # This is sample data for demonstration
+        analytics = {
+            'most_used_tools': [
+                {'name': 'Currency Converter', 'usage_count': 500},
+                {'name': 'Speed Test', 'usage_count': 300},
+                {'name': 'QR Generator', 'usage_count': 200}
+            ],
+            'usage_by_category': {
+                'calculators': 1000,
+                'network_tools': 800,
+                'utilities': 600
+            },
+            'usage_trends': [
+                {
+                    'date': (datetime.now() - timedelta(days=i)).strftime('%Y-%m-%d'),
+                    'total_usage': 100 - i * 5
+                } for i in range(7)
+            ]
+        }
+        
+        return jsonify({
+            'success': True,
+            'data': analytics
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+# Real-time metrics stream (Server-Sent Events)
+@blueprint.route('/ws/dashboard')
+def dashboard_ws():
+    sampler.snapshot()  # make sure this process is sampling
+    if not broadcaster.open_stream(current_app.config.get('DASHBOARD_MAX_STREAMS', 0)):
+        # Every stream slot of this worker is taken: the page polls instead
+        return Response('Too many dashboard streams', status=503,
+                        headers={'Retry-After': '30'})
+    response = Response(
+        stream_with_context(broadcaster.stream(
+            request.headers.get('Last-Event-ID'),
+            current_app.config.get('DASHBOARD_STREAM_MAX_AGE', 60)
+        )),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # disable nginx response buffering
+        }
+    )
+    # Also when the stream never started (the client went away at once)
+    response.call_on_close(broadcaster.close_stream)
+    return response
+
+# Helper function to format bytes to human readable format
+def format_bytes(bytes):
+    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
+        if bytes < 1024:
+            return f"{bytes:.2f} {unit}"
+        bytes /= 1024
+    return f"{bytes:.2f} PB"
@@ -0,0 +1,139 @@
+# -*- encoding: utf-8 -*-
+"""
+Server-Sent Events fan-out of the metrics sampler.
+
+The sampler thread publishes each reading once; every connected dashboard
+waits on a shared condition and receives only the fields that changed since
+the last message it saw. Open dashboards therefore cost one sampling loop
+per process, not one polling loop per tab.
+
+Each stream still holds a worker thread (or greenlet) while it is open, so
+a stream ends after ``max_age`` seconds, and EventSource reconnects with
+Last-Event-ID and resumes from the deltas. ``open_stream`` also caps the
+streams of a process; the dashboard polls instead when it is refused.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+
+
+def flatten(snapshot):
+    """{'cpu': {'usage_percent': 3}} -> {'cpu.usage_percent': 3}"""
+    fields = {}
+    for group, values in snapshot.items():
+        if isinstance(values, dict):
+            for name, value in values.items():
+                fields['{}.{}'.format(group, name)] = value
+        else:
+            fields[group] = values
+    return fields
+
+
+class MetricsBroadcaster:
+
+    def __init__(self, backlog=32, heartbeat=15.0):
+        self.heartbeat = heartbeat
+        self._streams = 0
+        self._streams_lock = threading.Lock()
+        self._state = {}
+        self._seq = 0
+        self._deltas = deque(maxlen=backlog)
+        self._changed = threading.Condition()
+
+    def publish(self, snapshot):
+        """Sampler listener: record which fields changed and wake clients."""
+        fields = flatten(snapshot)
+        with self._changed:
+            delta = {
+                name: value for name, value in fields.items()
+                if self._state.get(name, object()) != value
+            }
+            if not delta:
+                return
+            self._state.update(delta)
+            self._seq += 1
+            self._deltas.append((self._seq, delta))
+            self._changed.notify_all()
+
+    def _since(self, seq):
+        """Merged delta after ``seq``, or None if the client must resync."""
+        if seq is None or seq > self._seq:
+            return None
+        if self._seq > seq and (not self._deltas or self._deltas[0][0] > seq + 1):
+            return None
+        merged = {}
+        for delta_seq, delta in self._deltas:
+            if delta_seq > seq:
+                merged.update(delta)
+        return merged
+
+    def _poll(self, seq, timeout):
+        """Wait for readings newer than ``seq``: (seq, event, data) or None."""
+        with self._changed:
+            if self._seq == seq:
+                self._changed.wait(timeout)
+            if self._seq == seq:
+                return None
+            delta = self._since(seq)
+            if delta is None:
+                return self._seq, 'snapshot', dict(self._state)
+            return self._seq, 'delta', delta
+
+    @staticmethod
+    def event_id(seq):
+        # Sequence numbers are per process; tag them so a client that
+        # reconnects to another worker gets a full snapshot
+        return '{}:{}'.format(os.getpid(), seq)
+
+    @staticmethod
+    def parse_event_id(value):
+        try:
+            pid, seq = value.split(':')
+            return int(seq) if int(pid) == os.getpid() else None
+        except (AttributeError, ValueError):
+            return None
+
+    def open_stream(self, limit=0):
+        """Reserve one of ``limit`` streams of this process (0: no limit);
+        False when they are all taken. Release it with ``close_stream``."""
+        with self._streams_lock:
+            if limit and self._streams >= limit:
+                return False
+            self._streams += 1
+            return True
+
+    def close_stream(self):
+        with self._streams_lock:
+            self._streams -= 1
+
+    def stream(self, last_event_id=None, max_age=None):
+        """Generator of SSE messages: a full snapshot first (or the deltas
+        since ``last_event_id``), then deltas, for ``max_age`` seconds."""
+        seq = self.parse_event_id(last_event_id)
+        if seq is None:
+            seq = -1  # always differs from the current sequence number
+        deadline = time.monotonic() + max_age if max_age else None
+
+        yield 'retry: 1000\n\n'
+        while True:
+            timeout = self.heartbeat
+            if deadline is not None:
+                timeout = min(timeout, deadline - time.monotonic())
+                if timeout <= 0:
+                    return
+            update = self._poll(seq, timeout)
+            if update is None:
+                # Keep proxies from closing an idle stream
+                yield ': keep-alive\n\n'
+                continue
+
+            seq, event, data = update
+            yield 'id: {}\nevent: {}\ndata: {}\n\n'.format(
+                self.event_id(seq), event,
+                json.dumps(data, separators=(',', ':')))
+
+
+broadcaster = MetricsBroadcaster()
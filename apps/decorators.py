@@ -0,0 +1,67 @@
+# -*- encoding: utf-8 -*-
+"""
+View decorators shared by the tool blueprints.
+"""
+
+from datetime import timedelta
+from functools import wraps
+
+from flask import jsonify, make_response, request
+from flask_limiter.util import get_remote_address
+
+from apps.cache import freeze_response, request_key, thaw_response
+from apps.extensions import rate_limiter, view_cache
+from apps.ratelimit import rate_limit_headers
+
+# Rate limiting decorators
+def rate_limit(calls=100, period=timedelta(minutes=1), algorithm='sliding_window'):
+    """Allow ``calls`` requests per ``period`` and client address.
+
+    ``algorithm`` is 'sliding_window' or 'token_bucket' (see apps/ratelimit.py).
+    Responses carry X-RateLimit-* headers, and Retry-After when limited.
+    """
+    seconds = period.total_seconds() if isinstance(period, timedelta) else period
+
+    def decorator(f):
+        @wraps(f)
+        def wrapped(*args, **kwargs):
+            key = f"{get_remote_address()}:{f.__name__}"
+            result = rate_limiter.hit(key, calls, seconds, algorithm)
+            headers = rate_limit_headers(result)
+
+            if not result.allowed:
+                return jsonify({
+                    'error': 'Rate limit exceeded'
+                }), 429, headers
+
+            response = make_response(f(*args, **kwargs))
+            response.headers.extend(headers)
+            return response
+        return wrapped
+    return decorator
+
+# Cache decorator
+def cached(timeout=5 * 60):
+    """Cache successful responses for ``timeout`` seconds, keyed by the
+    endpoint and the request's inputs (see apps/cache.py). Requests with
+    uploaded files are never cached."""
+    def decorator(f):
+        @wraps(f)
+        def wrapped(*args, **kwargs):
+            if request.files:
+                return f(*args, **kwargs)
+
+            response = None
+
+            def compute():
+                nonlocal response
+                response = f(*args, **kwargs)
+                return freeze_response(response)
+
+            frozen = view_cache.get_or_compute(
+                request_key(), compute, timeout, request.endpoint)
+            if frozen is None:
+                return response
+            return thaw_response(frozen)
+        return wrapped
+    return decorator
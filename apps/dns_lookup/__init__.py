@@ -0,0 +1,12 @@
+# -*- encoding: utf-8 -*-
+"""
+DNS lookup
+"""
+
+from flask import Blueprint
+
+blueprint = Blueprint(
+    'dns_lookup_blueprint',
+    __name__,
+    url_prefix=''
+)
@@ -0,0 +1,67 @@
+# -*- encoding: utf-8 -*-
+"""
+DNS lookup
+"""
+
+from flask import render_template, request, jsonify
+
+from apps.decorators import cached
+from apps.dns_lookup import blueprint
+from apps.httpcache import conditional, template_version
+from apps.lazy import lazy_import
+from apps.metrics import observe
+
+dns_resolver = lazy_import('dns.resolver')
+whois = lazy_import('whois')
+
+
+@blueprint.route('/dns-lookup')
+@conditional(version=template_version)
+def dns_lookup():
+    return render_template('home/dns-lookup.html', segment='dns-lookup')
+
+@blueprint.route('/lookup-dns', methods=['POST'])
+@cached(timeout=60)
+def lookup_dns():
+    try:
+        domain = request.form.get('domain')
+        if not domain:
+            return jsonify({
+                'success': False,
+                'error': 'Domain name is required'
+            }), 400
+
+        record_types = ['A', 'AAAA', 'MX', 'NS', 'TXT', 'SOA', 'CNAME', 'PTR']
+        results = {}
+
+        for record_type in record_types:
+            try:
+                with observe('dns_resolve'):
+                    answers = dns_resolver.resolve(domain, record_type)
+                results[record_type] = {
+                    'records': [str(rdata) for rdata in answers],
+                    'ttl': answers.rrset.ttl
+                }
+            except Exception as e:
+                results[record_type] = {
+                    'records': [],
+                    'error': str(e)
+                }
+
+        # Add WHOIS information if possible
+        try:
+            whois_info = whois.whois(domain)
+            results['WHOIS'] = whois_info
+        except:
+            results['WHOIS'] = None
+
+        return jsonify({
+            'success': True,
+            'domain': domain,
+            'results': results
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
@@ -0,0 +1,65 @@
+# -*- encoding: utf-8 -*-
+"""
+Shared extension instances for Kareem's Tech Tools.
+
+Kept separate from the tool blueprints so that any subset of tools can be
+loaded without importing the others.
+"""
+
+import logging
+import sys
+from logging.handlers import RotatingFileHandler
+
+from flask_caching import Cache
+from flask_compress import Compress
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
+from flask_socketio import SocketIO
+from apscheduler.schedulers.background import BackgroundScheduler
+import redis
+
+from apps import db
+from apps.cache import TwoTierCache
+from apps.ratelimit import RateLimiter
+
+# Initialize extensions
+socketio = SocketIO()
+cache = Cache()
+compress = Compress()
+view_cache = TwoTierCache(cache)
+limiter = Limiter(key_func=get_remote_address)
+scheduler = BackgroundScheduler()
+redis_client = redis.Redis()
+rate_limiter = RateLimiter(redis_client)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        RotatingFileHandler(
+            'app.log', maxBytes=10000000, backupCount=5
+        ),
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+
+
+def reinit_after_fork(app):
+    """Give a freshly forked worker its own connections and threads.
+
+    With gunicorn's preload_app the master imports the app once and every
+    worker inherits its module-level objects, including open sockets.
+    """
+    redis_client.connection_pool.reset()
+
+    # close=False: the pooled connections are shared with the parent, and
+    # closing them here would close the parent's sockets too; the child
+    # just starts a new pool
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+    # Threads do not survive fork(); jobs added while the app was imported
+    # are still pending and start running in this process only
+    if not scheduler.running and scheduler.get_jobs():
+        scheduler.start()
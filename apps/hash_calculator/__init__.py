@@ -0,0 +1,12 @@
+# -*- encoding: utf-8 -*-
+"""
+Hash calculator
+"""
+
+from flask import Blueprint
+
+blueprint = Blueprint(
+    'hash_calculator_blueprint',
+    __name__,
+    url_prefix=''
+)
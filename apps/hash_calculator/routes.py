@@ -0,0 +1,55 @@
+# -*- encoding: utf-8 -*-
+"""
+Hash calculator
+"""
+
+import hashlib
+
+from flask import render_template, request, jsonify
+
+from apps.hash_calculator import blueprint
+from apps.httpcache import conditional, template_version
+
+
+# Hash Calculator routes
+@blueprint.route('/hash-calculator')
+@conditional(version=template_version)
+def hash_calculator():
+    return render_template('home/hash-calculator.html', segment='hash-calculator')
+
+@blueprint.route('/generate-hash', methods=['POST'])
+def generate_hash():
+    try:
+        text = request.form.get('text')
+        algorithm = request.form.get('algorithm', 'sha256').lower()
+        
+        if not text:
+            return jsonify({'success': False, 'error': 'No text provided'})
+
+        # Dictionary of supported hash algorithms
+        hash_functions = {
+            'md5': hashlib.md5,
+            'sha1': hashlib.sha1,
+            'sha256': hashlib.sha256,
+            'sha512': hashlib.sha512
+        }
+        
+        if algorithm not in hash_functions:
+            return jsonify({'success': False, 'error': 'Unsupported hash algorithm'})
+            
+        # Generate hash
+        hash_obj = hash_functions[algorithm]()
+        hash_obj.update(text.encode('utf-8'))
+        hash_value = hash_obj.hexdigest()
+
+        return jsonify({
+            'success': True,
+            'hash': hash_value,
+            'algorithm': algorithm
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
@@ -0,0 +1,149 @@
+# -*- encoding: utf-8 -*-
+"""
+Readiness checks for /readyz.
+
+Each check is cheap but touches the network (database, Redis), so the
+combined result is cached for HEALTH_CACHE_SECONDS and load balancer probes
+never queue up behind a slow dependency.
+"""
+
+import threading
+import time
+
+from sqlalchemy import text
+
+from apps import db
+from apps.sampler import resource_status, sampler
+
+
+def _ping_database(app, outcome):
+    try:
+        with app.app_context():
+            with db.engine.connect() as connection:
+                connection.execute(text('SELECT 1'))
+    except Exception as e:
+        outcome['error'] = e
+
+
+# The query of an earlier check that is still running past its timeout
+_stuck_ping = None
+
+
+def check_database(app):
+    """SELECT 1, given up after HEALTH_CHECK_TIMEOUT seconds.
+
+    The drivers have no common timeout option, so the query runs in a
+    thread. While a timed out query is still stuck, later checks fail at
+    once instead of starting (and leaving behind) another thread.
+    """
+    global _stuck_ping
+    if _stuck_ping is not None and _stuck_ping.is_alive():
+        raise TimeoutError('an earlier database check is still waiting')
+
+    timeout = app.config.get('HEALTH_CHECK_TIMEOUT', 1.0)
+    outcome = {}
+    ping = threading.Thread(target=_ping_database, args=(app, outcome),
+                            name='readyz-database', daemon=True)
+    ping.start()
+    ping.join(timeout)
+    if ping.is_alive():
+        _stuck_ping = ping
+        raise TimeoutError('no answer within {:g}s'.format(timeout))
+    _stuck_ping = None
+    if 'error' in outcome:
+        raise outcome['error']
+
+    pool = db.engine.pool
+    status = {'ok': True}
+    if hasattr(pool, 'checkedout'):
+        status['pool'] = {
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'overflow': pool.overflow()
+        }
+    return status
+
+
+def check_redis(app):
+    # Only the Redis rate limiting backend uses the shared client
+    if app.config.get('RATELIMIT_BACKEND', 'redis') != 'redis':
+        return {'ok': True, 'skipped': 'RATELIMIT_BACKEND is not redis'}
+
+    from redis.backoff import NoBackoff
+    from redis.retry import Retry
+    from apps.extensions import redis_client
+
+    # A one-off connection to the same server as the shared client, but
+    # with a short timeout and no retries so an outage is reported quickly
+    pool = redis_client.connection_pool
+    timeout = app.config.get('HEALTH_CHECK_TIMEOUT', 1.0)
+    connection = pool.connection_class(**dict(
+        pool.connection_kwargs,
+        socket_timeout=timeout,
+        socket_connect_timeout=timeout,
+        retry=Retry(NoBackoff(), 0)
+    ))
+    try:
+        connection.send_command('PING')
+        connection.read_response()
+    finally:
+        connection.disconnect()
+    return {'ok': True}
+
+
+def check_sampler(app):
+    snapshot = sampler.snapshot()
+    age = sampler.age()
+    # A reading older than a few intervals means the thread is stuck
+    fresh = age is not None and age < max(3 * sampler.interval, 5)
+    return {
+        'ok': sampler.running and fresh,
+        'age': round(age, 3) if age is not None else None,
+        'resources': resource_status(
+            snapshot, app.config.get('HEALTH_RESOURCE_THRESHOLD', 80)
+        )
+    }
+
+
+CHECKS = {
+    'database': check_database,
+    'redis': check_redis,
+    'sampler': check_sampler
+}
+
+
+class ReadinessProbe:
+
+    def __init__(self):
+        self._result = None
+        self._checked_at = 0
+        self._lock = threading.Lock()
+
+    def run_checks(self, app):
+        checks = {}
+        for name in app.config.get('READINESS_CHECKS', CHECKS):
+            try:
+                checks[name] = CHECKS[name](app)
+            except Exception as e:
+                checks[name] = {'ok': False, 'error': str(e)}
+        return {
+            'ready': all(check['ok'] for check in checks.values()),
+            'checks': checks,
+            'checked_at': time.time()
+        }
+
+    def result(self, app):
+        """Cached result; only one thread per process refreshes it."""
+        max_age = app.config.get('HEALTH_CACHE_SECONDS', 5)
+        if self._result is None or time.time() - self._checked_at > max_age:
+            # Probes arriving while a refresh is running get the last result
+            if self._lock.acquire(blocking=self._result is None):
+                try:
+                    self._result = self.run_checks(app)
+                    self._checked_at = time.time()
+                finally:
+                    self._lock.release()
+        return self._result
+
+
+readiness = ReadinessProbe()
@@ -0,0 +1,128 @@
+# -*- encoding: utf-8 -*-
+"""
+HTTP conditional caching: ETag, Last-Modified and Cache-Control.
+
+``conditional`` adds validators to a GET/HEAD response and turns a matching
+If-None-Match / If-Modified-Since into a 304 without a body. Views whose
+output only depends on the templates (the tool pages) pass
+``version=template_version`` so that a 304 is answered before the template
+is rendered at all. The Cache-Control policy is set per route and can be
+overridden per endpoint with the HTTP_CACHE_CONTROL setting.
+"""
+
+import hashlib
+import os
+import time
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import current_app, make_response, request
+
+
+def _etag(*parts):
+    return hashlib.sha1(
+        '\0'.join(str(part) for part in parts).encode()
+    ).hexdigest()[:20]
+
+
+class TemplateVersion:
+    """Newest modification time of the app's templates and static files
+    (pages embed fingerprinted asset URLs, see apps/assets.py).
+
+    Scanned once, or at most once a second when templates auto-reload.
+    """
+
+    def __init__(self):
+        self._mtime = None
+        self._checked_at = 0.0
+
+    def mtime(self, app):
+        if self._mtime is None or (
+                app.templates_auto_reload
+                and time.monotonic() - self._checked_at > 1):
+            newest = 0.0
+            for folder in (os.path.join(app.root_path, app.template_folder),
+                           app.static_folder):
+                for root, _, files in os.walk(folder):
+                    for name in files:
+                        newest = max(newest, os.path.getmtime(os.path.join(root, name)))
+            self._mtime = newest
+            self._checked_at = time.monotonic()
+        return self._mtime
+
+    def __call__(self):
+        """(etag, last_modified) of a page rendered from the templates."""
+        app = current_app._get_current_object()
+        mtime = self.mtime(app)
+        return (_etag(mtime, request.path, ','.join(app.config.get('ENABLED_TOOLS', ()))),
+                datetime.fromtimestamp(int(mtime), timezone.utc))
+
+
+template_version = TemplateVersion()
+
+
+def _not_modified(etag, last_modified):
+    if request.if_none_match:
+        if etag is None:
+            return False
+        if request.if_none_match.star_tag:
+            return True
+        # Flask-Compress sends compressed responses with '<etag>:<encoding>'
+        tags = request.if_none_match.as_set(include_weak=True)
+        return etag in {tag.rsplit(':', 1)[0] for tag in tags}
+    if request.if_modified_since and last_modified is not None:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def conditional(cache_control='no-cache', version=None):
+    """Serve ``cache_control`` with an ETag and answer revalidations with 304.
+
+    ``version`` is an optional callable returning ``(etag, last_modified)``
+    for the current request, either of which may be None; it lets a 304 be
+    answered without calling the view. Without it the ETag is a hash of
+    the response body. Only GET and HEAD are conditional: other methods
+    (e.g. the POST form of /calculate-import-grid) always get the full
+    response.
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapped(*args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return f(*args, **kwargs)
+
+            policy = current_app.config.get('HTTP_CACHE_CONTROL', {}).get(
+                request.endpoint, cache_control)
+
+            etag = last_modified = None
+            if version is not None:
+                etag, last_modified = version()
+                if _not_modified(etag, last_modified):
+                    response = make_response('', 304)
+                    response.set_etag(etag)
+                    response.headers['Cache-Control'] = policy
+                    return response
+
+            response = make_response(f(*args, **kwargs))
+            if response.status_code != 200 or response.is_streamed:
+                return response
+
+            if etag is not None:
+                response.set_etag(etag)
+            elif 'ETag' not in response.headers:
+                response.add_etag()
+            if last_modified is None:
+                last_modified = response.last_modified
+            else:
+                response.last_modified = last_modified
+            response.headers['Cache-Control'] = policy
+
+            if _not_modified(response.get_etag()[0], last_modified):
+                not_modified = make_response('', 304)
+                for header in ('ETag', 'Last-Modified', 'Cache-Control', 'Vary'):
+                    if header in response.headers:
+                        not_modified.headers[header] = response.headers[header]
+                return not_modified
+            return response
+        return wrapped
+    return decorator
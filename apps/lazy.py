@@ -0,0 +1,156 @@
+# -*- encoding: utf-8 -*-
+"""
+Lazy module registry for heavy tool dependencies.
+
+Tools declare their third-party libraries with ``lazy_import`` instead of a
+top-level ``import``. The real import happens on first attribute access, so a
+worker only pays for the libraries of the tools it actually serves.
+"""
+
+import importlib
+import json
+import subprocess
+import sys
+import threading
+import time
+import types
+
+# name -> LazyModule, in declaration order
+registry = {}
+
+_lock = threading.RLock()
+
+
+def _current_rss():
+    """Resident set size of this process in bytes (0 if unknown)."""
+    try:
+        with open('/proc/self/statm') as statm:
+            import resource
+            return int(statm.read().split()[1]) * resource.getpagesize()
+    except (OSError, ImportError, ValueError, IndexError):
+        return 0
+
+
+class LazyModule(types.ModuleType):
+    """Module proxy that imports the real module on first attribute access."""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__['_lazy_module'] = None
+        self.__dict__['_lazy_stats'] = None
+
+    def _load(self):
+        module = self.__dict__['_lazy_module']
+        if module is not None:
+            return module
+
+        with _lock:
+            module = self.__dict__['_lazy_module']
+            if module is None:
+                rss_before = _current_rss()
+                start = time.perf_counter()
+                module = importlib.import_module(self.__name__)
+                self.__dict__['_lazy_stats'] = {
+                    'seconds': time.perf_counter() - start,
+                    'rss_bytes': max(0, _current_rss() - rss_before),
+                    'loaded_at': time.time()
+                }
+                self.__dict__['_lazy_module'] = module
+        return module
+
+    @property
+    def is_loaded(self):
+        return self.__dict__['_lazy_module'] is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self.is_loaded else 'not loaded'
+        return '<lazy module {!r} ({})>'.format(self.__name__, state)
+
+
+def lazy_import(name):
+    """Return a shared lazy proxy for module ``name``.
+
+    Modules that are already imported (e.g. by another tool) are returned as
+    is, so there is never more than one proxy per module.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    with _lock:
+        module = registry.get(name)
+        if module is None:
+            module = registry[name] = LazyModule(name)
+        return module
+
+
+def loaded_modules():
+    """In-process import cost of every lazy module that has been loaded."""
+    return {
+        name: module.__dict__['_lazy_stats']
+        for name, module in registry.items()
+        if isinstance(module, LazyModule) and module.is_loaded
+    }
+
+
+# Executed in a fresh interpreter so each measurement starts from a cold
+# ``sys.modules`` and is not skewed by what the parent has already imported.
+_PROBE = '''
+import json, sys, time
+sys.path.insert(0, {path!r})
+def rss():
+    import resource
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * resource.getpagesize()
+before = rss()
+start = time.perf_counter()
+error = None
+try:
+    {code}
+except Exception as e:
+    error = '%s: %s' % (type(e).__name__, e)
+print(json.dumps({{
+    'seconds': time.perf_counter() - start,
+    'rss_bytes': rss() - before,
+    'error': error
+}}))
+'''
+
+
+def measure_import(code, path='.', timeout=120):
+    """Measure wall time and RSS growth of running ``code`` in a new process."""
+    probe = _PROBE.format(path=path, code=code)
+    try:
+        output = subprocess.run(
+            [sys.executable, '-c', probe],
+            capture_output=True, text=True, timeout=timeout, check=False
+        ).stdout.strip().splitlines()
+        return json.loads(output[-1])
+    except (subprocess.TimeoutExpired, ValueError, IndexError) as e:
+        return {'seconds': None, 'rss_bytes': None, 'error': str(e)}
+
+
+def import_report(modules=None, boot_code=None, path='.'):
+    """Per-module cold import cost plus the cost of booting the app.
+
+    ``modules`` defaults to every module declared through ``lazy_import``.
+    """
+    if modules is None:
+        modules = list(registry)
+
+    report = {
+        'python': sys.version.split()[0],
+        'modules': {}
+    }
+    for name in modules:
+        report['modules'][name] = measure_import(
+            'import {}'.format(name), path=path
+        )
+    if boot_code:
+        report['boot'] = measure_import(boot_code, path=path)
+    return report
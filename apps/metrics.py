@@ -0,0 +1,75 @@
+# -*- encoding: utf-8 -*-
+"""
+Prometheus instrumentation.
+
+Every request is counted and timed per endpoint and status by app-wide
+before/after-request hooks, and the expensive tool operations have their own
+histogram. Under gunicorn, set PROMETHEUS_MULTIPROC_DIR so that /metrics
+aggregates all workers (see gunicorn-cfg.py).
+"""
+
+import os
+import time
+
+from flask import Response, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram,
+    generate_latest, multiprocess
+)
+
+# Prometheus metrics
+REQUEST_COUNT = Counter(
+    'request_count', 'App Request Count',
+    ['method', 'endpoint', 'http_status']
+)
+REQUEST_LATENCY = Histogram(
+    'request_latency_seconds', 'Request latency',
+    ['method', 'endpoint', 'http_status']
+)
+TOOL_OPERATION_LATENCY = Histogram(
+    'tool_operation_seconds', 'Latency of expensive tool operations',
+    ['operation'],
+    buckets=(.001, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30, 60)
+)
+CACHE_REQUESTS = Counter(
+    'cache_requests', 'View cache lookups by tier that answered',
+    ['endpoint', 'result']
+)
+
+
+def observe(operation):
+    """Time a block or function, e.g. ``with observe('qr_render'):``."""
+    return TOOL_OPERATION_LATENCY.labels(operation=operation).time()
+
+
+def _start_timer():
+    g.request_start_time = time.perf_counter()
+
+
+def _record_request(response):
+    start = g.pop('request_start_time', None)
+    if start is None:
+        return response
+
+    endpoint = request.endpoint or 'unmatched'
+    labels = (request.method, endpoint, str(response.status_code))
+    REQUEST_COUNT.labels(*labels).inc()
+    REQUEST_LATENCY.labels(*labels).observe(time.perf_counter() - start)
+    return response
+
+
+def metrics_view():
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+
+
+def register_metrics(app):
+    app.before_request(_start_timer)
+    app.after_request(_record_request)
+
+    if app.config.get('METRICS_ENDPOINT_ENABLED', True):
+        app.add_url_rule('/metrics', 'metrics', metrics_view)
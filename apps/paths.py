@@ -0,0 +1,30 @@
+# -*- encoding: utf-8 -*-
+"""
+Private directories for files the app loads back (compiled templates,
+exchange rate snapshots).
+
+Anything read from a directory another local user can write to can be
+planted, so such directories are created with mode 0700 and an existing
+one is only used when this process owns it and nobody else can write to it.
+"""
+
+import os
+import stat
+
+
+class UnsafeDirectoryError(RuntimeError):
+    pass
+
+
+def private_directory(path):
+    """Create ``path`` (mode 0700) if needed and check that it is safe to
+    load files from; returns the path or raises UnsafeDirectoryError."""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode):
+        raise UnsafeDirectoryError('{} is not a directory'.format(path))
+    if info.st_uid != os.getuid():
+        raise UnsafeDirectoryError('{} is owned by another user'.format(path))
+    if info.st_mode & 0o022:
+        raise UnsafeDirectoryError('{} is writable by other users'.format(path))
+    return path
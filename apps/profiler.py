@@ -0,0 +1,268 @@
+# -*- encoding: utf-8 -*-
+"""
+On-demand sampling profiler for slow requests.
+
+A profiled request gets a companion thread that samples the request
+thread's stack every PROFILER_INTERVAL seconds. The samples are stored as
+collapsed stacks ("frame;frame;frame count", the input format of
+flamegraph.pl and speedscope) in PROFILER_DIR, where every worker can read
+them back through the admin endpoints in apps/admin.
+
+A request is profiled when it carries a valid signed ``X-Profile`` token
+(see ``flask profiler-token``) or, at random, for PROFILER_SAMPLE_RATE of
+all requests.
+"""
+
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from flask import g, request
+from itsdangerous import BadSignature, TimestampSigner
+
+TOKEN_HEADER = 'X-Profile'
+_SALT = 'apps.profiler'
+
+
+class StackSampler:
+    """Samples one thread's Python stack from a background thread."""
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name='stack-sampler', daemon=True
+        )
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self.started
+        return self.stacks
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append('{} ({}:{})'.format(
+                    code.co_name,
+                    frame.f_globals.get('__name__', code.co_filename),
+                    code.co_firstlineno))
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+
+
+class ProfileStore:
+    """Collapsed-stack files plus a JSON metadata file per profile."""
+
+    def __init__(self, directory, max_profiles=200):
+        self.directory = directory
+        self.max_profiles = max_profiles
+
+    def _path(self, profile_id, extension):
+        # Profile ids are generated here; reject anything that is not one
+        if not profile_id.isalnum():
+            raise KeyError(profile_id)
+        return os.path.join(self.directory, profile_id + extension)
+
+    def save(self, stacks, meta):
+        """Store a profile; returns its id, or None for one without samples
+        (a request shorter than the sampling interval)."""
+        if not stacks:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        profile_id = uuid.uuid4().hex[:16]
+        meta = dict(meta, id=profile_id, samples=sum(stacks.values()))
+
+        with open(self._path(profile_id, '.collapsed'), 'w') as output:
+            for stack, count in stacks.most_common():
+                output.write('{} {}\n'.format(stack, count))
+        with open(self._path(profile_id, '.json'), 'w') as output:
+            json.dump(meta, output)
+
+        self.prune()
+        return profile_id
+
+    def list(self):
+        if not os.path.isdir(self.directory):
+            return []
+        profiles = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.json') and name != 'settings.json':
+                try:
+                    with open(os.path.join(self.directory, name)) as meta:
+                        profiles.append(json.load(meta))
+                except (OSError, ValueError):
+                    continue
+        return sorted(profiles, key=lambda p: p['time'], reverse=True)
+
+    def load(self, profile_id):
+        try:
+            with open(self._path(profile_id, '.collapsed')) as collapsed:
+                return collapsed.read()
+        except OSError:
+            raise KeyError(profile_id)
+
+    def prune(self):
+        # By file age: reading every metadata file on each save does not scale
+        try:
+            entries = [
+                entry for entry in os.scandir(self.directory)
+                if entry.name.endswith('.json') and entry.name != 'settings.json'
+            ]
+        except OSError:
+            return
+        if len(entries) <= self.max_profiles:
+            return
+
+        def modified(entry):
+            try:
+                return entry.stat().st_mtime
+            except OSError:
+                return 0
+
+        entries.sort(key=modified, reverse=True)
+        for entry in entries[self.max_profiles:]:
+            profile_id = entry.name[:-len('.json')]
+            for extension in ('.collapsed', '.json'):
+                try:
+                    os.remove(self._path(profile_id, extension))
+                except (KeyError, OSError):
+                    pass
+
+    # Runtime settings shared by all workers (admin toggle)
+
+    def settings(self):
+        try:
+            with open(os.path.join(self.directory, 'settings.json')) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def update_settings(self, **settings):
+        os.makedirs(self.directory, exist_ok=True)
+        current = dict(self.settings(), **settings)
+        path = os.path.join(self.directory, 'settings.json')
+        with open(path + '.tmp', 'w') as f:
+            json.dump(current, f)
+        os.replace(path + '.tmp', path)
+        return current
+
+
+class Profiler:
+
+    def __init__(self):
+        self.store = None
+        self.interval = 0.005
+        self.default_sample_rate = 0.0
+        self.token_max_age = 3600
+        self._signer = None
+        self._sample_rate = (0, 0.0)  # (checked_at, rate)
+
+    def init_app(self, app):
+        self.store = ProfileStore(
+            app.config['PROFILER_DIR'],
+            app.config.get('PROFILER_MAX_PROFILES', 200)
+        )
+        self.interval = app.config.get('PROFILER_INTERVAL', self.interval)
+        self.default_sample_rate = app.config.get('PROFILER_SAMPLE_RATE', 0.0)
+        self.token_max_age = app.config.get('PROFILER_TOKEN_MAX_AGE', 3600)
+        self._signer = TimestampSigner(app.config['SECRET_KEY'], salt=_SALT)
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    # Tokens
+
+    def make_token(self):
+        return self._signer.sign(b'profile').decode('ascii')
+
+    def valid_token(self, token):
+        if not token:
+            return False
+        try:
+            self._signer.unsign(token, max_age=self.token_max_age)
+            return True
+        except BadSignature:
+            return False
+
+    # Sampling decision
+
+    @property
+    def sample_rate(self):
+        # The admin toggle lives in a shared file; re-read it at most once
+        # per second
+        checked_at, rate = self._sample_rate
+        now = time.time()
+        if now - checked_at > 1:
+            rate = self.store.settings().get(
+                'sample_rate', self.default_sample_rate)
+            self._sample_rate = (now, rate)
+        return rate
+
+    def wants_profile(self):
+        if self.valid_token(request.headers.get(TOKEN_HEADER)):
+            return True
+        rate = self.sample_rate
+        return rate > 0 and random.random() < rate
+
+    # Request hooks
+
+    def _before_request(self):
+        if request.endpoint and request.endpoint.startswith('admin_blueprint.'):
+            return
+        if self.wants_profile():
+            g.stack_sampler = StackSampler(
+                threading.get_ident(), self.interval
+            ).start()
+
+    def _finish(self, status=None):
+        """Save the request's profile: returns its id, '' when it has no
+        samples, or None when the request was not profiled."""
+        stack_sampler = g.pop('stack_sampler', None)
+        if stack_sampler is None:
+            return None
+        stacks = stack_sampler.stop()
+        return self.store.save(stacks, {
+            'time': time.time(),
+            'endpoint': request.endpoint,
+            'method': request.method,
+            'path': request.path,
+            'status': status,
+            'duration': round(stack_sampler.duration, 6),
+            'interval': self.interval
+        }) or ''
+
+    def _after_request(self, response):
+        profile_id = self._finish(response.status_code)
+        if profile_id:
+            response.headers['X-Profile-Id'] = profile_id
+        elif profile_id == '':
+            response.headers['X-Profile-Status'] = (
+                'not saved: no samples, the request took less than the '
+                '{}s sampling interval'.format(self.interval))
+        return response
+
+    def _teardown_request(self, exception=None):
+        # Only still running if the view raised
+        self._finish(500 if exception else None)
+
+
+profiler = Profiler()
@@ -0,0 +1,12 @@
+# -*- encoding: utf-8 -*-
+"""
+Public IP lookup
+"""
+
+from flask import Blueprint
+
+blueprint = Blueprint(
+    'public_ip_blueprint',
+    __name__,
+    url_prefix=''
+)
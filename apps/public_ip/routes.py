@@ -0,0 +1,41 @@
+# -*- encoding: utf-8 -*-
+"""
+Public IP lookup
+"""
+
+import socket
+
+from flask import render_template, jsonify
+
+from apps.httpcache import conditional, template_version
+from apps.lazy import lazy_import
+from apps.public_ip import blueprint
+
+requests = lazy_import('requests')
+
+
+# Public IP routes
+@blueprint.route('/public-ip')
+@conditional(version=template_version)
+def public_ip():
+    return render_template('home/public-ip.html', segment='public-ip')
+
+@blueprint.route('/get-ip-info', methods=['GET'])
+def get_ip_info():
+    try:
+        # Using ipapi.co for detailed IP information
+        response = requests.get('https://ipapi.co/json/')
+        if response.status_code == 200:
+            data = response.json()
+            # Add additional hostname lookup
+            try:
+                hostname = socket.gethostbyaddr(data['ip'])[0]
+            except:
+                hostname = None
+            
+            data['hostname'] = hostname
+            return jsonify(data)
+        else:
+            return jsonify({'error': 'Failed to fetch IP information'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
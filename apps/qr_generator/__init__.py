@@ -0,0 +1,12 @@
+# -*- encoding: utf-8 -*-
+"""
+QR code generator
+"""
+
+from flask import Blueprint
+
+blueprint = Blueprint(
+    'qr_generator_blueprint',
+    __name__,
+    url_prefix=''
+)
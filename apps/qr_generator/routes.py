@@ -0,0 +1,89 @@
+# -*- encoding: utf-8 -*-
+"""
+QR code generator
+"""
+
+import base64
+from io import BytesIO
+
+from flask import render_template, request, jsonify
+
+from apps.decorators import cached
+from apps.httpcache import conditional, template_version
+from apps.lazy import lazy_import
+from apps.metrics import observe
+from apps.qr_generator import blueprint
+
+qrcode = lazy_import('qrcode')
+qrcode_constants = lazy_import('qrcode.constants')
+PIL_Image = lazy_import('PIL.Image')
+
+
+@blueprint.route('/qr-generator')
+@conditional(version=template_version)
+def qr_generator_page():
+    """Render the QR code generator page"""
+    return render_template('home/qr-generator.html', segment='qr-generator')
+    
+@blueprint.route('/generate-qr', methods=['POST'])
+@cached(timeout=24 * 3600)
+def generate_qr():
+    try:
+        # Get form data
+        text = request.form.get('text')
+        size = request.form.get('size', '300')
+        
+        # Validate inputs
+        if not text:
+            return jsonify({
+                'success': False,
+                'error': 'No text provided'
+            }), 400
+
+        try:
+            size = int(size)
+            if size < 100 or size > 1000:
+                size = 300
+        except ValueError:
+            size = 300
+
+        print(f"Generating QR code for text: {text}, size: {size}")  # Debug log
+
+        with observe('qr_render'):
+            # Create QR code
+            qr = qrcode.QRCode(
+                version=None,  # Auto-determine version
+                error_correction=qrcode_constants.ERROR_CORRECT_L,
+                box_size=10,
+                border=4,
+            )
+
+            # Add data and make QR code
+            qr.add_data(text)
+            qr.make(fit=True)
+
+            # Create image
+            qr_image = qr.make_image(fill_color="black", back_color="white")
+
+            # Resize if needed
+            if qr_image.size != (size, size):
+                qr_image = qr_image.resize((size, size), PIL_Image.Resampling.LANCZOS)
+
+            # Convert to base64
+            buffered = BytesIO()
+            qr_image.save(buffered, format="PNG")
+        qr_base64 = base64.b64encode(buffered.getvalue()).decode('utf-8')
+
+        print("QR code generated successfully")  # Debug log
+
+        return jsonify({
+            'success': True,
+            'qr_code': qr_base64
+        })
+
+    except Exception as e:
+        print(f"Error generating QR code: {str(e)}")  # Debug log
+        return jsonify({
+            'success': False,
+            'error': f'Failed to generate QR code: {str(e)}'
+        }), 400
@@ -0,0 +1,349 @@
+# -*- encoding: utf-8 -*-
+"""
+Atomic rate limiting.
+
+Two backends, selected with RATELIMIT_BACKEND:
+
+``redis``
+    Each check is a single Lua script call on the Redis server, so the
+    read, decision and update happen in one round trip and cannot
+    interleave with another worker's check for the same key.
+
+``memory``
+    Counters live in a memory-mapped file (on /dev/shm when available, in
+    a directory private to the user) shared by every worker process of the
+    deployment on the host, each slot set guarded by its own byte-range
+    lock. No network hop and no Redis needed, but limits are per host.
+
+Both implement the same two algorithms:
+
+``sliding_window``
+    Counts of the current and previous fixed window, the previous one
+    weighted by how much of it still overlaps the sliding window. Two
+    integers per key, smooths the burst at window boundaries.
+
+``token_bucket``
+    A bucket of ``limit`` tokens refilled continuously at ``limit / period``
+    tokens per second. Allows short bursts up to ``limit``.
+"""
+
+import fcntl
+import hashlib
+import math
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+from apps.paths import UnsafeDirectoryError, private_directory
+
+# allowed: bool, remaining: int, retry_after / reset: seconds (float)
+RateLimitResult = namedtuple(
+    'RateLimitResult', ['allowed', 'limit', 'remaining', 'retry_after', 'reset']
+)
+
+ALGORITHMS = ('sliding_window', 'token_bucket')
+
+# Both scripts read the clock from the server so that workers on different
+# hosts agree; replicate_commands() is needed for that on Redis < 5.
+_CLOCK = '''
+pcall(redis.replicate_commands)
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+'''
+
+SLIDING_WINDOW_SCRIPT = _CLOCK + '''
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local window = math.floor(now / period)
+
+local state = redis.call('HMGET', KEYS[1], 'w', 'c', 'p')
+local last_window = tonumber(state[1])
+local current = tonumber(state[2]) or 0
+local previous = tonumber(state[3]) or 0
+
+if last_window ~= window then
+    if last_window == window - 1 then
+        previous = current
+    else
+        previous = 0
+    end
+    current = 0
+end
+
+local elapsed = (now % period) / period
+local used = previous * (1 - elapsed) + current
+local allowed = 0
+local retry_after = 0
+
+if used + 1 <= limit then
+    allowed = 1
+    current = current + 1
+    used = used + 1
+elseif previous > 0 and limit - current - 1 >= 0 then
+    -- wait until enough of the previous window has slid out
+    local needed = 1 - (limit - current - 1) / previous
+    retry_after = math.ceil((needed - elapsed) * period)
+else
+    -- the current window alone is full: wait for the next window, then
+    -- until enough of this one has slid out
+    local needed = 0
+    if current > 0 then
+        needed = math.max(0, 1 - (limit - 1) / current)
+    end
+    retry_after = period - (now % period) + math.ceil(needed * period)
+end
+
+redis.call('HSET', KEYS[1], 'w', window, 'c', current, 'p', previous)
+redis.call('PEXPIRE', KEYS[1], period * 2)
+
+return {allowed, math.floor(limit - used), retry_after, period - (now % period)}
+'''
+
+TOKEN_BUCKET_SCRIPT = _CLOCK + '''
+local capacity = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local rate = capacity / period
+
+local state = redis.call('HMGET', KEYS[1], 't', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local last = tonumber(state[2]) or now
+
+tokens = math.min(capacity, tokens + math.max(0, now - last) * rate)
+
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    allowed = 1
+    tokens = tokens - 1
+else
+    retry_after = math.ceil((1 - tokens) / rate)
+end
+
+redis.call('HSET', KEYS[1], 't', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], period)
+
+return {allowed, math.floor(tokens), retry_after, math.ceil((capacity - tokens) / rate)}
+'''
+
+
+class RedisRateLimiter:
+    """Rate limiter backed by server-side scripts on a Redis client."""
+
+    def __init__(self, client, prefix='ratelimit'):
+        self.client = client
+        self.prefix = prefix
+        self._scripts = {
+            'sliding_window': client.register_script(SLIDING_WINDOW_SCRIPT),
+            'token_bucket': client.register_script(TOKEN_BUCKET_SCRIPT)
+        }
+
+    def hit(self, key, limit, period, algorithm='sliding_window'):
+        """Consume one request for ``key``; ``period`` is in seconds."""
+        try:
+            script = self._scripts[algorithm]
+        except KeyError:
+            raise ValueError('Unknown rate limit algorithm {!r}, expected one '
+                             'of {}'.format(algorithm, ', '.join(ALGORITHMS)))
+
+        allowed, remaining, retry_after, reset = script(
+            keys=['{}:{}:{}'.format(self.prefix, algorithm, key)],
+            args=[limit, int(period * 1000)]
+        )
+        return RateLimitResult(
+            allowed=bool(allowed),
+            limit=limit,
+            remaining=max(0, remaining),
+            retry_after=retry_after / 1000.0,
+            reset=reset / 1000.0
+        )
+
+
+class SharedMemoryRateLimiter:
+    """Rate limiter on a memory-mapped file shared by the host's workers.
+
+    The file is a set-associative table: a key hashes to one set of
+    ``ways`` slots, and only that set is locked (a thread lock within the
+    process plus an fcntl byte-range lock across processes) while the key
+    is updated. When a set is full the slot that expires first is reused.
+    """
+
+    # key hash, expires at, then (window, current, previous) for the
+    # sliding window or (tokens, last refill, unused) for the token bucket
+    SLOT = struct.Struct('<Qdddd')
+
+    def __init__(self, path, slots=65536, ways=8):
+        self.path = path
+        self.ways = ways
+        self.sets = max(1, slots // ways)
+        self.size = self.sets * ways * self.SLOT.size
+        self._fd = None
+        self._map = None
+        self._pid = None
+        self._open_lock = threading.Lock()
+        self._locks = [threading.Lock() for _ in range(64)]
+
+    def _open(self):
+        # Each process maps the file itself; a mapping inherited from a
+        # preloading master would work, but its fcntl locks would not
+        if self._pid == os.getpid():
+            return
+        with self._open_lock:
+            if self._pid == os.getpid():
+                return
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+            info = os.fstat(fd)
+            # Anyone else able to write the counters could reset them
+            if info.st_uid != os.getuid() or info.st_mode & 0o077:
+                os.close(fd)
+                raise UnsafeDirectoryError(
+                    'Rate limit file {} must be owned by this user with mode '
+                    '0600'.format(self.path))
+            if info.st_size < self.size:
+                os.ftruncate(fd, self.size)
+            self._map = mmap.mmap(fd, self.size)
+            self._fd = fd
+            self._pid = os.getpid()
+
+    @contextmanager
+    def _lock(self, index):
+        """Hold slot set ``index`` against other threads and processes."""
+        with self._locks[index % len(self._locks)]:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, index)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, index)
+
+    def hit(self, key, limit, period, algorithm='sliding_window'):
+        """Consume one request for ``key``; ``period`` is in seconds."""
+        if algorithm not in ALGORITHMS:
+            raise ValueError('Unknown rate limit algorithm {!r}, expected one '
+                             'of {}'.format(algorithm, ', '.join(ALGORITHMS)))
+        self._open()
+
+        digest = hashlib.blake2b(
+            '{}:{}'.format(algorithm, key).encode(), digest_size=8).digest()
+        key_hash = int.from_bytes(digest, 'little') or 1  # 0 marks a free slot
+        index = key_hash % self.sets
+        base = index * self.ways * self.SLOT.size
+
+        with self._lock(index):
+            now = time.time()
+            offset, state = self._find(base, key_hash, now)
+            if algorithm == 'sliding_window':
+                result, state, expires = _sliding_window(state, limit, period, now)
+            else:
+                result, state, expires = _token_bucket(state, limit, period, now)
+            self.SLOT.pack_into(self._map, offset, key_hash, expires, *state)
+        return result
+
+    def _find(self, base, key_hash, now):
+        """Offset of the key's slot and its state (None if new)."""
+        victim = victim_expires = None
+        for way in range(self.ways):
+            offset = base + way * self.SLOT.size
+            slot_hash, expires, a, b, c = self.SLOT.unpack_from(self._map, offset)
+            if slot_hash == key_hash:
+                return offset, (a, b, c) if expires > now else None
+            if victim is None or expires < victim_expires:
+                victim, victim_expires = offset, expires
+        return victim, None
+
+
+def _sliding_window(state, limit, period, now):
+    """Same decision as SLIDING_WINDOW_SCRIPT; ``state`` is (window,
+    current, previous) or None."""
+    window = math.floor(now / period)
+    last_window, current, previous = state or (None, 0, 0)
+    if last_window != window:
+        previous = current if last_window == window - 1 else 0
+        current = 0
+
+    elapsed = (now % period) / period
+    used = previous * (1 - elapsed) + current
+    reset = period - (now % period)
+    retry_after = 0
+
+    allowed = used + 1 <= limit
+    if allowed:
+        current += 1
+        used += 1
+    elif previous > 0 and limit - current - 1 >= 0:
+        retry_after = (1 - (limit - current - 1) / previous - elapsed) * period
+    else:
+        needed = max(0, 1 - (limit - 1) / current) if current > 0 else 0
+        retry_after = reset + needed * period
+
+    result = RateLimitResult(allowed, limit, max(0, math.floor(limit - used)),
+                             retry_after, reset)
+    return result, (window, current, previous), (window + 2) * period
+
+
+def _token_bucket(state, capacity, period, now):
+    """Same decision as TOKEN_BUCKET_SCRIPT; ``state`` is (tokens, last
+    refill, unused) or None."""
+    rate = capacity / period
+    tokens, last, _ = state or (capacity, now, 0)
+    tokens = min(capacity, tokens + max(0, now - last) * rate)
+
+    allowed = tokens >= 1
+    retry_after = 0
+    if allowed:
+        tokens -= 1
+    else:
+        retry_after = (1 - tokens) / rate
+
+    result = RateLimitResult(allowed, capacity, math.floor(tokens),
+                             retry_after, (capacity - tokens) / rate)
+    return result, (tokens, now, 0), now + period
+
+
+def default_shm_path(app, name='ratelimit'):
+    """File in a private (0700) directory on /dev/shm, one per user and
+    deployment (the app's instance path), so two deployments on one host
+    do not share their limits."""
+    base = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    deployment = hashlib.blake2b(app.instance_path.encode(), digest_size=4).hexdigest()
+    directory = private_directory(
+        os.path.join(base, 'tech-tools-{}-{}'.format(os.getuid(), deployment)))
+    return os.path.join(directory, name)
+
+
+class RateLimiter:
+    """The configured backend, chosen by ``init_app``."""
+
+    def __init__(self, redis_client=None):
+        self.redis_client = redis_client
+        self.backend = None
+
+    def init_app(self, app):
+        name = app.config.get('RATELIMIT_BACKEND', 'redis')
+        if name == 'redis':
+            self.backend = RedisRateLimiter(self.redis_client)
+        elif name == 'memory':
+            self.backend = SharedMemoryRateLimiter(
+                app.config.get('RATELIMIT_SHM_PATH') or default_shm_path(app),
+                app.config.get('RATELIMIT_SHM_SLOTS', 65536)
+            )
+        else:
+            raise RuntimeError('Unknown RATELIMIT_BACKEND {!r}, expected '
+                               "'redis' or 'memory'".format(name))
+
+    def hit(self, key, limit, period, algorithm='sliding_window'):
+        return self.backend.hit(key, limit, period, algorithm)
+
+
+def rate_limit_headers(result):
+    headers = {
+        'X-RateLimit-Limit': str(result.limit),
+        'X-RateLimit-Remaining': str(result.remaining),
+        'X-RateLimit-Reset': str(math.ceil(result.reset))
+    }
+    if not result.allowed:
+        headers['Retry-After'] = str(max(1, math.ceil(result.retry_after)))
+    return headers
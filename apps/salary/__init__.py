@@ -0,0 +1,12 @@
+# -*- encoding: utf-8 -*-
+"""
+Salary and salary-increase calculators
+"""
+
+from flask import Blueprint
+
+blueprint = Blueprint(
+    'salary_blueprint',
+    __name__,
+    url_prefix=''
+)
@@ -0,0 +1,341 @@
+# -*- encoding: utf-8 -*-
+"""
+Vectorised batch payroll.
+
+``compute`` applies a tax year's PayrollPlan (see rules.py) to a whole
+employee sheet at once with NumPy column operations, and ``write_xlsx``
+streams the result into a workbook in xlsxwriter's constant-memory mode.
+``solve_basic`` runs the calculation backwards, from target net pays to
+the basic salaries that yield them, and ``increase_sweep`` prices many
+salary increases at once.
+
+These batch paths compute in floating point, not with the Decimals of
+PayrollPlan.calculate, and round to cents (half up) only at the end.
+Salaries are far below the 2**53 cents where doubles stop being exact, so
+the accumulated error stays many orders of magnitude under half a cent
+and ``_cents`` absorbs it. Each path is checked against the Decimal
+engine, cent for cent, in tests/test_payroll.py; keep them in step when
+the rules change.
+"""
+
+from apps.lazy import lazy_import
+from apps.salary.rules import MAX_BASIC_CENTS
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+xlsxwriter = lazy_import('xlsxwriter')
+
+# Input columns (all optional except basic_salary). Any number of
+# taxable_allowance* / non_taxable_allowance* columns are summed, like the
+# taxable_allowance_{i} fields of the single-employee form.
+ID_COLUMNS = ('employee_id', 'name')
+TEMPLATE_COLUMNS = ID_COLUMNS + (
+    'basic_salary', 'taxable_allowance_1', 'non_taxable_allowance_1',
+    'overtime_amount', 'second_job_income', 'insurance_type',
+    'insurance_premium', 'loan_deduction', 'gpsu_deduction', 'num_children'
+)
+
+OUTPUT_COLUMNS = (
+    'basic_salary', 'total_taxable_allowances', 'total_non_taxable_allowances',
+    'gross_pay', 'personal_allowance', 'nis_contribution', 'insurance_deduction',
+    'chargeable_income', 'paye_tax', 'loan_deduction', 'gpsu_deduction',
+    'total_deductions', 'net_pay', 'monthly_gratuity', 'annual_gratuity',
+    'total_annual_package'
+)
+
+
+class PayrollInputError(ValueError):
+    pass
+
+
+def read_sheet(stream, filename):
+    """DataFrame from an uploaded .csv, .xlsx or .xls file."""
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    if extension == 'csv':
+        frame = pd.read_csv(stream)
+    elif extension in ('xlsx', 'xls'):
+        frame = pd.read_excel(stream)
+    else:
+        raise PayrollInputError('Upload a .csv or .xlsx file')
+    return _normalise_columns(frame)
+
+
+def read_records(records):
+    """DataFrame from a list of row dicts (a JSON request body)."""
+    return _normalise_columns(pd.DataFrame(records))
+
+
+def _normalise_columns(frame):
+    frame.columns = [str(c).strip().lower().replace(' ', '_') for c in frame.columns]
+    return frame
+
+
+def _numeric(frame, column):
+    if column not in frame:
+        return np.zeros(len(frame))
+    values = pd.to_numeric(frame[column], errors='coerce')
+    invalid = values.isna() & frame[column].notna()
+    if invalid.any():
+        rows = ', '.join(str(i + 2) for i in np.flatnonzero(invalid.to_numpy())[:10])
+        raise PayrollInputError(
+            'Column {} is not a number in row(s) {}'.format(column, rows))
+    return values.fillna(0).to_numpy(dtype=float)
+
+
+def _sum_columns(frame, prefix):
+    total = np.zeros(len(frame))
+    for column in frame.columns:
+        if column.startswith(prefix):
+            total += _numeric(frame, column)
+    return total
+
+
+def _cents(values):
+    # Half-up like rules.cents (np.round rounds half to even). Exact half
+    # cents are common (5.6% of a cent amount); rounding away the float
+    # noise first keeps 0.005 from arriving as 0.00499999...
+    scaled = np.round(np.abs(values) * 100, 6)
+    return np.sign(values) * np.floor(scaled + 0.5) / 100
+
+
+def _paye(plan, chargeable):
+    paye = np.zeros(len(chargeable))
+    bands = plan.paye_bands
+    for i, (lower, rate, _) in enumerate(bands):
+        upper = float(bands[i + 1][0]) if i + 1 < len(bands) else np.inf
+        paye += np.clip(chargeable - float(lower), 0, upper - float(lower)) * float(rate)
+    return paye
+
+
+def _inputs(frame, plan):
+    """Per-employee payroll inputs other than basic_salary, as arrays."""
+    overtime = _numeric(frame, 'overtime_amount')
+    second_job = _numeric(frame, 'second_job_income')
+
+    # Premium by insurance type, or the given premium for third parties
+    if 'insurance_type' in frame:
+        types = (frame['insurance_type'].astype(str).str.strip()
+                 .str.replace(r'\.0$', '', regex=True))
+    else:
+        types = pd.Series('1', index=frame.index)
+    premiums = {k: float(v) for k, v in plan.insurance_premiums.items()}
+    premium = np.array(types.map(premiums).fillna(0), dtype=float)
+    third_party = (types == plan.third_party_insurance).to_numpy()
+    premium[third_party] = _numeric(frame, 'insurance_premium')[third_party]
+
+    return {
+        'taxable_allowances': _sum_columns(frame, 'taxable_allowance'),
+        'non_taxable_allowances': _sum_columns(frame, 'non_taxable_allowance'),
+        'overtime': overtime,
+        'second_job': second_job,
+        'premium': premium,
+        'loan': _numeric(frame, 'loan_deduction'),
+        'gpsu': _numeric(frame, 'gpsu_deduction'),
+        'children': _numeric(frame, 'num_children')
+    }
+
+
+def _payroll(plan, basic, taxable_allowances, non_taxable_allowances, overtime,
+             second_job, premium, loan, gpsu, children):
+    """PayrollPlan.calculate over arrays; {output column: unrounded array}."""
+    overtime_tax_free = np.minimum(overtime, float(plan.overtime_tax_free))
+    second_job_tax_free = np.minimum(second_job, float(plan.second_job_tax_free))
+    taxable = (taxable_allowances
+               + (overtime - overtime_tax_free)
+               + (second_job - second_job_tax_free))
+    non_taxable = non_taxable_allowances + overtime_tax_free + second_job_tax_free
+
+    gross = basic + taxable + non_taxable
+    personal_allowance = float(plan.personal_allowance) + children * float(plan.child_allowance)
+    nis_base = basic if plan.nis_base == 'basic_salary' else gross
+    nis = np.minimum(nis_base * float(plan.nis_rate), float(plan.nis_cap))
+    insurance = np.minimum(np.minimum(premium, gross * float(plan.insurance_gross_share)),
+                           float(plan.insurance_cap))
+    chargeable = np.maximum(
+        0, basic + taxable - personal_allowance - nis - insurance)
+    paye = _paye(plan, chargeable)
+    deductions = nis + paye + loan + gpsu + insurance
+    net = gross - deductions
+    monthly_gratuity = basic * float(plan.gratuity_rate)
+
+    return {
+        'basic_salary': basic,
+        'total_taxable_allowances': taxable,
+        'total_non_taxable_allowances': non_taxable,
+        'gross_pay': gross,
+        'personal_allowance': personal_allowance,
+        'nis_contribution': nis,
+        'insurance_deduction': insurance,
+        'chargeable_income': chargeable,
+        'paye_tax': paye,
+        'loan_deduction': loan,
+        'gpsu_deduction': gpsu,
+        'total_deductions': deductions,
+        'net_pay': net,
+        'monthly_gratuity': monthly_gratuity,
+        'annual_gratuity': monthly_gratuity * 12,
+        # Net and gratuity for the year plus one month's basic as vacation
+        'total_annual_package': net * 12 + monthly_gratuity * 12 + basic
+    }
+
+
+def _result(frame, outputs, leading=()):
+    """ID columns of ``frame``, then ``leading`` and OUTPUT_COLUMNS rounded
+    to cents."""
+    result = pd.DataFrame({
+        column: frame[column].to_numpy()
+        for column in ID_COLUMNS if column in frame
+    })
+    if result.empty:
+        result['row'] = np.arange(1, len(frame) + 1)
+    for column in tuple(leading) + OUTPUT_COLUMNS:
+        result[column] = _cents(outputs[column])
+    return result
+
+
+def _require(frame, column):
+    if column not in frame:
+        raise PayrollInputError('Missing required column ' + column)
+    if frame[column].isna().any():
+        rows = np.flatnonzero(frame[column].isna().to_numpy())[:10] + 2
+        raise PayrollInputError('{} is empty in row(s) {}'.format(
+            column, ', '.join(map(str, rows))))
+    return _numeric(frame, column)
+
+
+def compute(frame, plan):
+    """Payroll for every row of ``frame`` under ``plan``; returns a new
+    DataFrame with the ID columns followed by OUTPUT_COLUMNS."""
+    basic = _require(frame, 'basic_salary')
+    return _result(frame, _payroll(plan, basic, **_inputs(frame, plan)))
+
+
+def solve_basic(frame, plan):
+    """Basic salary needed for the ``target_net_pay`` of every row of
+    ``frame``, the other payroll inputs as given.
+
+    Net pay is increasing and piecewise linear in the basic salary, so each
+    row is solved over whole cents by interpolating within a bracket,
+    alternated with bisection steps to bound the number of rounds: a few
+    rounds for the whole frame. Returns compute()'s DataFrame with a
+    target_net_pay column; each basic_salary is the smallest one reaching
+    its target.
+    """
+    target = _cents(_require(frame, 'target_net_pay'))
+    inputs = _inputs(frame, plan)
+
+    def net(cents):
+        return _cents(_payroll(plan, cents / 100, **inputs)['net_pay'])
+
+    lo = np.zeros(len(frame))
+    net_lo = net(lo)
+    hi = np.maximum(np.ceil(target * 200), 100)
+    # Grow the bracket until it holds the target
+    while True:
+        if (hi > MAX_BASIC_CENTS).any():
+            rows = np.flatnonzero(hi > MAX_BASIC_CENTS)[:10] + 2
+            raise PayrollInputError('target_net_pay cannot be reached in row(s) {}'.format(
+                ', '.join(map(str, rows))))
+        net_hi = net(hi)
+        short = net_hi < target
+        if not short.any():
+            break
+        lo[short], net_lo[short] = hi[short], net_hi[short]
+        hi[short] *= 2
+
+    # Rows already at the target without a basic salary
+    solved = net_lo >= target
+    hi[solved] = 0
+    lo[solved] = -1
+
+    interpolate = True
+    while (hi - lo > 1).any():
+        if interpolate:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                step = np.ceil((target - net_lo) * (hi - lo) / (net_hi - net_lo))
+            middle = np.clip(lo + np.nan_to_num(step), lo + 1, hi - 1)
+        else:
+            middle = np.floor((lo + hi) / 2)
+        interpolate = not interpolate
+        middle = np.where(hi - lo > 1, middle, hi)
+        net_middle = net(middle)
+        reached = net_middle >= target
+        hi, net_hi = np.where(reached, middle, hi), np.where(reached, net_middle, net_hi)
+        lo, net_lo = np.where(reached, lo, middle), np.where(reached, net_lo, net_middle)
+
+    outputs = _payroll(plan, hi / 100, **inputs)
+    outputs['target_net_pay'] = target
+    return _result(frame, outputs, leading=('target_net_pay',))
+
+
+def increase_sweep(plan, current_salary, percentages, children=(0,), taxable=(True,)):
+    """calculate_salary_increase for every combination of increase
+    percentage, child count and taxable flag in one broadcast pass.
+
+    Returns ``(combinations, curves)``: one (children, taxable) pair per
+    curve row, and {name: 2-D array of curve rows x percentages}.
+    """
+    percentages = np.asarray(percentages, dtype=float)[np.newaxis, :]
+    combinations = [(c, t) for c in children for t in taxable]
+    kids = np.array([c for c, _ in combinations], dtype=float)[:, np.newaxis]
+    is_taxable = np.array([t for _, t in combinations])[:, np.newaxis]
+
+    increase = current_salary * percentages / 100
+    gross = current_salary + increase
+    nis = np.minimum(gross * float(plan.nis_rate), float(plan.nis_cap))
+    allowance = float(plan.personal_allowance) + kids * float(plan.child_allowance)
+    taxed_pay = np.where(is_taxable, gross, current_salary)
+    chargeable = np.maximum(0, taxed_pay - allowance - nis)
+    paye = _paye(plan, chargeable.ravel()).reshape(chargeable.shape)
+    net = gross - nis - paye
+    gratuity = gross * float(plan.gratuity_rate)
+    package = (net + gratuity) * 12 + gross
+
+    shape = chargeable.shape
+    curves = {
+        'new_gross_pay': gross,
+        'increase_amount': increase,
+        'new_nis': nis,
+        'new_paye': paye,
+        'new_net_pay': net,
+        'new_deductions': nis + paye,
+        'new_monthly_gratuity': gratuity,
+        'new_total_annual_package': package,
+        'monthly_difference': net - current_salary / 12,
+        'annual_difference': (net - current_salary / 12) * 12,
+        'chargeable_income': chargeable
+    }
+    return combinations, {
+        name: _cents(np.broadcast_to(values, shape)) for name, values in curves.items()
+    }
+
+
+def write_xlsx(result, output):
+    """Write ``result`` row by row to ``output`` (a path or binary file)."""
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+    sheet = workbook.add_worksheet('Payroll')
+    header = workbook.add_format({'bold': True, 'bottom': 1})
+    money = workbook.add_format({'num_format': '#,##0.00'})
+    total = workbook.add_format({'bold': True, 'top': 1, 'num_format': '#,##0.00'})
+
+    columns = list(result.columns)
+    first_money = len(columns) - len(OUTPUT_COLUMNS)
+    sheet.set_column(0, max(first_money - 1, 0), 16)
+    sheet.set_column(first_money, len(columns) - 1, 16, money)
+    sheet.write_row(0, 0, [c.replace('_', ' ').title() for c in columns], header)
+
+    # Rows must be written in order in constant-memory mode; the typed
+    # write_* calls skip write()'s per-cell type dispatch
+    ids = [result[c].fillna('').astype(str).tolist() for c in columns[:first_money]]
+    values = result[columns[first_money:]].to_numpy().tolist()
+    write_string, write_number = sheet.write_string, sheet.write_number
+    for row, numbers in enumerate(values, start=1):
+        for col, column in enumerate(ids):
+            write_string(row, col, column[row - 1])
+        for col, number in enumerate(numbers, start=first_money):
+            write_number(row, col, number)
+
+    totals = result[columns[first_money:]].sum().round(2).tolist()
+    sheet.write(len(values) + 1, 0, 'Total', total)
+    sheet.write_row(len(values) + 1, first_money, totals, total)
+    workbook.close()
@@ -0,0 +1,188 @@
+# -*- encoding: utf-8 -*-
+"""
+Payslip PDFs for a whole payroll.
+
+WeasyPrint takes a good fraction of a second per page and holds the GIL, so
+payslips are rendered in a pool of worker processes. Each worker imports
+WeasyPrint and compiles templates/payslips/payslip.html once, in the pool
+initializer, and then renders any number of payslips. The pool is created
+on first use and kept for the life of the web worker; it has
+PAYSLIP_WORKERS processes (default 1), since every gunicorn worker holds
+its own.
+
+``render`` yields the PDFs in employee order while at most a few per pool
+worker are in flight, and ``zip_stream`` packs them into a zip archive
+chunk by chunk. The response is streamed and neither side ever holds more
+than that window of PDFs.
+"""
+
+import logging
+import multiprocessing
+import os
+import re
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import jinja2
+
+from apps.lazy import lazy_import
+
+weasyprint = lazy_import('weasyprint')
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE = 'payslips/payslip.html'
+TEMPLATE_FOLDER = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates')
+
+# Payslips in flight per pool worker
+WINDOW_PER_WORKER = 4
+
+
+class PayslipError(RuntimeError):
+    pass
+
+
+# Worker process side
+
+_template = None
+
+
+def _init_worker(template_folder):
+    global _template
+    env = jinja2.Environment(
+        loader=jinja2.FileSystemLoader(template_folder),
+        autoescape=True
+    )
+    _template = env.get_template(TEMPLATE)
+    # Import it now rather than during the first payslip
+    weasyprint.HTML
+
+
+def _render(context):
+    return weasyprint.HTML(string=_template.render(**context)).write_pdf()
+
+
+# Web worker side
+
+_pool = None
+_pool_pid = None
+_pool_size = 0
+_pool_lock = threading.Lock()
+
+
+def pool(workers=None):
+    """The process pool of this web worker (created after a fork, too)."""
+    global _pool, _pool_pid, _pool_size
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool_size = workers or os.cpu_count() or 1
+            # spawn: forking a threaded web worker is not safe
+            _pool = ProcessPoolExecutor(
+                max_workers=_pool_size,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(TEMPLATE_FOLDER,)
+            )
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def reset_pool():
+    """Drop a broken pool; the next ``pool()`` starts a new one."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def render(contexts, workers=None):
+    """Yield ``(context, pdf bytes)`` for every template context, in order."""
+    executor = pool(workers)
+    window = _pool_size * WINDOW_PER_WORKER
+    pending = deque()
+    contexts = iter(contexts)
+    try:
+        while True:
+            for context in contexts:
+                pending.append((context, executor.submit(_render, context)))
+                if len(pending) >= window:
+                    break
+            if not pending:
+                return
+            context, future = pending.popleft()
+            yield context, future.result()
+    except BrokenProcessPool as e:
+        reset_pool()
+        raise PayslipError('PDF rendering is not available: {}'.format(e))
+    except Exception as e:
+        logger.exception('Payslip rendering failed')
+        raise PayslipError('Payslip rendering failed: {}'.format(e))
+    finally:
+        # The client went away or rendering failed
+        for _, future in pending:
+            future.cancel()
+
+
+def _identity(value):
+    # A blank cell reads as NaN, and turns a column of numeric IDs to floats
+    if value is None or value != value:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def employees(result):
+    """Rows of payroll.compute()'s DataFrame as template dicts, with the
+    IDs and names missing from the sheet as None rather than "nan"."""
+    records = result.to_dict('records')
+    for record in records:
+        for key in ('employee_id', 'name'):
+            if key in record:
+                record[key] = _identity(record[key])
+    return records
+
+
+def filename(index, employee):
+    parts = ['{:05d}'.format(index)] + [
+        str(employee[key]) for key in ('employee_id', 'name') if employee.get(key)
+    ]
+    return re.sub(r'[^\w.-]+', '_', '-'.join(parts)) + '.pdf'
+
+
+class _Chunks:
+    """Write-only file for ZipFile; collects what was written since the
+    last ``take``."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def zip_stream(files):
+    """Zip archive of ``(name, data)`` pairs, yielded in chunks.
+
+    PDFs are compressed already, so they are stored as they are.
+    """
+    output = _Chunks()
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_STORED) as archive:
+        for name, data in files:
+            archive.writestr(name, data)
+            yield output.take()
+    yield output.take()
@@ -0,0 +1,408 @@
+# -*- encoding: utf-8 -*-
+"""
+Salary and salary-increase calculators
+"""
+
+import tempfile
+from datetime import date
+from decimal import InvalidOperation
+
+from flask import Response, current_app, render_template, request, jsonify, send_file
+
+from apps.httpcache import conditional, template_version
+from apps.metrics import observe
+from apps.salary import blueprint, payroll, payslips, rules
+from apps.salary.rules import money
+
+
+@blueprint.route('/salary-calculator')
+@conditional(version=template_version)
+def salary_calculator():
+    return render_template('home/salary-calculator.html', segment='salary-calculator')
+
+def _plan():
+    """Rule set of the tax_year form field, or of the current year."""
+    year = request.values.get('tax_year')
+    return rules.plan_for(int(year) if year else None)
+
+def _json_money(values):
+    """Decimals rounded half-up to cents, as JSON numbers."""
+    return {key: float(rules.cents(value)) for key, value in values.items()}
+
+def _salary_inputs(form):
+    """PayrollPlan.calculate arguments from the salary form, except the
+    basic salary."""
+    # taxable_allowance_{i} / non_taxable_allowance_{i} fields
+    num_taxable = int(form.get('num_taxable', 0))
+    num_non_taxable = int(form.get('num_non_taxable', 0))
+    taxable_allowances = sum(
+        (money(form.get(f'taxable_allowance_{i}')) for i in range(num_taxable)),
+        rules.ZERO)
+    non_taxable_allowances = sum(
+        (money(form.get(f'non_taxable_allowance_{i}')) for i in range(num_non_taxable)),
+        rules.ZERO)
+
+    return dict(
+        taxable_allowances=taxable_allowances,
+        non_taxable_allowances=non_taxable_allowances,
+        overtime=money(form.get('overtime_amount')),
+        second_job=money(form.get('second_job_income')),
+        insurance_type=form.get('insurance_type'),
+        insurance_premium=money(form.get('insurance_premium')),
+        loan_deduction=money(form.get('loan_deduction')),
+        gpsu_deduction=money(form.get('gpsu_deduction')),
+        children=int(form.get('num_children', 0))
+    )
+
+@blueprint.route('/calculate-salary', methods=['POST'])
+def calculate_salary():
+    try:
+        plan = _plan()
+        result = plan.calculate(
+            basic_salary=money(request.form.get('basic_salary')),
+            **_salary_inputs(request.form)
+        )
+
+        return jsonify({
+            'success': True,
+            'tax_year': plan.year,
+            'data': _json_money(result)
+        })
+
+    except Exception as e:
+        print(f"Error in calculate_salary: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@blueprint.route('/calculate-gross-salary', methods=['POST'])
+def calculate_gross_salary():
+    """Basic salary needed for a target net pay (the calculate-salary form
+    with target_net_pay instead of basic_salary)."""
+    try:
+        plan = _plan()
+        target = money(request.form.get('target_net_pay'))
+        basic_salary, result = plan.solve_basic_salary(
+            target, **_salary_inputs(request.form))
+        result['basic_salary'] = basic_salary
+
+        return jsonify({
+            'success': True,
+            'tax_year': plan.year,
+            'basic_salary': float(basic_salary),
+            'data': _json_money(result)
+        })
+
+    except InvalidOperation:
+        # Decimal context overflow in the payroll arithmetic
+        return jsonify({
+            'success': False,
+            'error': 'The amounts are out of range'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@blueprint.route('/calculate-gross-salary-batch', methods=['POST'])
+def calculate_gross_salary_batch():
+    """Basic salaries for many targets in one vectorised solve.
+
+    JSON body: ``{"tax_year": 2025, "targets": [...]}`` or just the list of
+    targets, where a target is a net pay or an object with target_net_pay
+    and the payroll template's columns (num_children, insurance_type, ...).
+    """
+    body = request.get_json(silent=True) or {}
+    # A bare list is the targets of the current tax year
+    if isinstance(body, list):
+        body = {'targets': body}
+    targets = body.get('targets') if isinstance(body, dict) else None
+    if not isinstance(targets, list) or not targets:
+        return jsonify({
+            'success': False,
+            'error': 'targets must be a non-empty list'
+        }), 400
+
+    try:
+        max_rows = current_app.config.get('PAYROLL_MAX_ROWS', 100000)
+        if len(targets) > max_rows:
+            raise payroll.PayrollInputError(
+                'At most {} targets per request'.format(max_rows))
+        year = body.get('tax_year')
+        plan = rules.plan_for(int(year) if year else None)
+        frame = payroll.read_records([
+            target if isinstance(target, dict) else {'target_net_pay': target}
+            for target in targets
+        ])
+        with observe('payroll_solve'):
+            result = payroll.solve_basic(frame, plan)
+    except (payroll.PayrollInputError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+    return jsonify({
+        'success': True,
+        'tax_year': plan.year,
+        'results': result.to_dict('records')
+    })
+
+@blueprint.route('/calculate-salary-batch', methods=['POST'])
+def calculate_salary_batch():
+    """Payroll for every employee of an uploaded CSV/XLSX sheet, as XLSX."""
+    upload = request.files.get('file')
+    if upload is None or not upload.filename:
+        return jsonify({
+            'success': False,
+            'error': 'No file uploaded'
+        }), 400
+
+    try:
+        frame = payroll.read_sheet(upload.stream, upload.filename)
+        max_rows = current_app.config.get('PAYROLL_MAX_ROWS', 100000)
+        if len(frame) > max_rows:
+            raise payroll.PayrollInputError(
+                'At most {} employees per file'.format(max_rows))
+        with observe('payroll_batch'):
+            result = payroll.compute(frame, _plan())
+    except (payroll.PayrollInputError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+    # xlsxwriter keeps only the current row in memory; the finished
+    # workbook is spooled to disk and streamed from there
+    output = tempfile.TemporaryFile()
+    with observe('payroll_xlsx'):
+        payroll.write_xlsx(result, output)
+    output.seek(0)
+    return send_file(
+        output,
+        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        as_attachment=True,
+        download_name='payroll.xlsx'
+    )
+
+@blueprint.route('/payslips', methods=['POST'])
+def payslips_zip():
+    """Payslip PDFs for every employee of an uploaded sheet, as a zip."""
+    upload = request.files.get('file')
+    if upload is None or not upload.filename:
+        return jsonify({
+            'success': False,
+            'error': 'No file uploaded'
+        }), 400
+
+    try:
+        frame = payroll.read_sheet(upload.stream, upload.filename)
+        max_rows = current_app.config.get('PAYSLIP_MAX_ROWS', 5000)
+        if len(frame) > max_rows:
+            raise payroll.PayrollInputError(
+                'At most {} employees per file'.format(max_rows))
+        plan = _plan()
+        result = payroll.compute(frame, plan)
+    except (payroll.PayrollInputError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+    meta = {
+        'tax_year': plan.year,
+        'period': request.form.get('period') or date.today().strftime('%B %Y'),
+        'employer': request.form.get('employer', '')
+    }
+    contexts = (dict(meta, employee=employee) for employee in payslips.employees(result))
+    rendered = payslips.render(contexts, current_app.config.get('PAYSLIP_WORKERS'))
+    archive = payslips.zip_stream(
+        (payslips.filename(index, context['employee']), pdf)
+        for index, (context, pdf) in enumerate(rendered, start=1)
+    )
+
+    # Render the first payslip before answering, so that a missing PDF
+    # backend is an error response rather than an empty download
+    try:
+        first = next(archive)
+    except payslips.PayslipError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 503
+
+    def body():
+        yield first
+        yield from archive
+
+    return Response(
+        body(),
+        mimetype='application/zip',
+        headers={'Content-Disposition': 'attachment; filename=payslips.zip'}
+    )
+
+@blueprint.route('/payroll-template.csv')
+def payroll_template():
+    return Response(
+        ','.join(payroll.TEMPLATE_COLUMNS) + '\n',
+        mimetype='text/csv',
+        headers={'Content-Disposition': 'attachment; filename=payroll-template.csv'}
+    )
+
+def _sweep_percentages(form, max_points):
+    """``percentages`` (comma separated) or the range ``percentage_from``
+    to ``percentage_to`` inclusive in steps of ``percentage_step``."""
+    if form.get('percentages'):
+        return [float(money(p)) for p in form['percentages'].split(',') if p.strip()]
+    start = money(form.get('percentage_from'))
+    stop = money(form.get('percentage_to'))
+    step = money(form.get('percentage_step') or 1)
+    if step <= 0:
+        raise ValueError('percentage_step must be positive')
+    if stop < start:
+        raise ValueError('percentage_to must not be below percentage_from')
+    count = int((stop - start) / step) + 1
+    if count > max_points:
+        raise ValueError('At most {} points per sweep'.format(max_points))
+    return [float(start + i * step) for i in range(count)]
+
+@blueprint.route('/calculate-salary-increase-sweep', methods=['POST'])
+def calculate_salary_increase_sweep():
+    """/calculate-salary-increase for a range of percentages (and
+    optionally several child counts and both taxable flags) in one pass."""
+    try:
+        form = request.form
+        plan = _plan()
+        max_points = current_app.config.get('SALARY_SWEEP_MAX_POINTS', 10000)
+        current_salary = float(money(form.get('current_salary')))
+        percentages = _sweep_percentages(form, max_points)
+        # num_children and is_increase_taxable may be repeated
+        children = [int(c) for c in form.getlist('num_children')] or [0]
+        taxable = [t == 'yes' for t in form.getlist('is_increase_taxable')] or [False]
+
+        points = len(percentages) * len(children) * len(taxable)
+        if not percentages:
+            raise ValueError('No increase percentages given')
+        if points > max_points:
+            raise ValueError('At most {} points per sweep'.format(max_points))
+
+        with observe('salary_sweep'):
+            combinations, curves = payroll.increase_sweep(
+                plan, current_salary, percentages, children, taxable)
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+    return jsonify({
+        'success': True,
+        'tax_year': plan.year,
+        'percentages': percentages,
+        'series': [
+            dict({
+                'num_children': num_children,
+                'is_increase_taxable': is_taxable
+            }, **{name: values[row].tolist() for name, values in curves.items()})
+            for row, (num_children, is_taxable) in enumerate(combinations)
+        ]
+    })
+
+@blueprint.route('/calculate-salary-increase', methods=['POST'])
+def calculate_salary_increase():
+    try:
+        plan = _plan()
+
+        # Get the necessary data from the request
+        current_salary = money(request.form.get('current_salary'))
+        increase_percentage = money(request.form.get('increase_percentage'))
+        is_increase_taxable = request.form.get('is_increase_taxable') == 'yes'
+        num_children = int(request.form.get('num_children', 0))
+
+        # Calculate the increase amount
+        increase_amount = current_salary * increase_percentage / 100
+        new_gross_pay = current_salary + increase_amount
+
+        # The new salary is all basic pay
+        new_nis_contribution = plan.nis(new_gross_pay, new_gross_pay)
+        personal_allowance = plan.allowance(num_children)
+
+        if is_increase_taxable:
+            chargeable_income = max(rules.ZERO, new_gross_pay - personal_allowance - new_nis_contribution)
+        else:
+            # Only calculate tax on the original salary
+            chargeable_income = max(rules.ZERO, current_salary - personal_allowance - new_nis_contribution)
+        new_paye_tax = plan.paye(chargeable_income)
+
+        new_monthly_gratuity = plan.gratuity(new_gross_pay)
+        new_semi_annual_gratuity = new_monthly_gratuity * 6
+        new_annual_gratuity = new_monthly_gratuity * 12
+        new_vacation_allowance = new_gross_pay  # One month basic salary
+
+        # Calculate total deductions and net pay
+        new_total_deductions = new_nis_contribution + new_paye_tax
+        new_net_pay = new_gross_pay - new_total_deductions
+
+        # Calculate monthly, semi-annual, and annual net pay
+        new_monthly_net = new_net_pay
+        new_semi_annual_net = new_net_pay * 6
+        new_annual_net = new_net_pay * 12
+
+        # Calculate combined compensations
+        new_net_plus_monthly = new_monthly_net + new_monthly_gratuity
+        new_net_plus_semi = new_semi_annual_net + new_semi_annual_gratuity
+        new_net_plus_annual = new_annual_net + new_annual_gratuity
+        new_total_annual_package = new_net_plus_annual + new_vacation_allowance
+
+        # Calculate differences
+        monthly_difference = new_net_pay - (current_salary / 12)
+        annual_difference = monthly_difference * 12
+
+        return jsonify({
+            'success': True,
+            'tax_year': plan.year,
+            'data': _json_money({
+                # Basic salary information
+                'new_gross_pay': new_gross_pay,
+                'new_net_pay': new_net_pay,
+                'new_nis': new_nis_contribution,
+                'new_paye': new_paye_tax,
+                'new_deductions': new_total_deductions,
+                
+                # Increase details
+                'increase_percentage': increase_percentage,
+                'increase_amount': increase_amount,
+                'monthly_difference': monthly_difference,
+                'annual_difference': annual_difference,
+                
+                # Tax information
+                'chargeable_income': chargeable_income,
+                'personal_allowance': personal_allowance,
+                
+                # Net pay periods
+                'new_monthly_net': new_monthly_net,
+                'new_semi_annual_net': new_semi_annual_net,
+                'new_annual_net': new_annual_net,
+                
+                # New gratuity information
+                'new_monthly_gratuity': new_monthly_gratuity,
+                'new_semi_annual_gratuity': new_semi_annual_gratuity,
+                'new_annual_gratuity': new_annual_gratuity,
+                'new_vacation_allowance': new_vacation_allowance,
+                
+                # New combined compensations
+                'new_net_plus_monthly': new_net_plus_monthly,
+                'new_net_plus_semi': new_net_plus_semi,
+                'new_net_plus_annual': new_net_plus_annual,
+                'new_total_annual_package': new_total_annual_package
+            })
+        })
+
+    except Exception as e:
+        print(f"Error in calculate_salary_increase: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
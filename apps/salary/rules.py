@@ -0,0 +1,256 @@
+# -*- encoding: utf-8 -*-
+"""
+Versioned payroll rules.
+
+The rule set of every tax year lives in rules.json next to this module.
+``plan_for(year)`` loads the file once, compiles the year's rules into a
+``PayrollPlan`` (Decimal constants, PAYE band table, premium lookup) and
+memoises it, so a calculation is a handful of Decimal operations. Money is
+computed exactly and rounded half-up to cents on output only.
+
+A year without its own entry uses the newest earlier rule set.
+"""
+
+import json
+import os
+from datetime import date
+from decimal import Context, Decimal, InvalidOperation, ROUND_CEILING, ROUND_HALF_UP
+from functools import lru_cache
+
+RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rules.json')
+
+CENT = Decimal('0.01')
+ZERO = Decimal('0')
+
+# Bound method: about twice as fast as Decimal.quantize(CENT, rounding=...)
+_quantize = Context(rounding=ROUND_HALF_UP).quantize
+
+NIS_BASES = ('basic_salary', 'gross_pay')
+
+# Basic salaries above this (in cents) are not searched by solve_basic_salary
+MAX_BASIC_CENTS = 10 ** 14
+
+
+class RulesError(ValueError):
+    pass
+
+
+def money(value):
+    """Decimal from a form value or number; '' and None are zero."""
+    if value is None or value == '':
+        return ZERO
+    try:
+        amount = Decimal(str(value).strip())
+    except InvalidOperation:
+        raise ValueError('Not a number: {!r}'.format(value))
+    if not amount.is_finite():
+        raise ValueError('Not a number: {!r}'.format(value))
+    return amount
+
+
+def cents(amount):
+    return _quantize(amount, CENT)
+
+
+class PayrollPlan:
+    """One tax year's rules, ready to evaluate."""
+
+    def __init__(self, year, rules):
+        self.year = year
+        try:
+            self.personal_allowance = Decimal(rules['personal_allowance'])
+            self.child_allowance = Decimal(rules['child_allowance'])
+
+            nis = rules['nis']
+            self.nis_rate = Decimal(nis['rate'])
+            self.nis_cap = Decimal(nis['cap'])
+            self.nis_base = nis.get('base', 'basic_salary')
+            if self.nis_base not in NIS_BASES:
+                raise RulesError('nis.base must be one of ' + ', '.join(NIS_BASES))
+
+            # [(lower bound, rate, tax due below the lower bound)], ascending
+            self.paye_bands = []
+            due = ZERO
+            previous = None
+            for band in sorted(rules['paye_bands'], key=lambda b: Decimal(b['from'])):
+                lower, rate = Decimal(band['from']), Decimal(band['rate'])
+                if previous is not None:
+                    due += (lower - previous[0]) * previous[1]
+                self.paye_bands.append((lower, rate, due))
+                previous = (lower, rate)
+            if not self.paye_bands or self.paye_bands[0][0] != ZERO:
+                raise RulesError('paye_bands must start from 0')
+
+            insurance = rules['insurance']
+            self.insurance_gross_share = Decimal(insurance['gross_share'])
+            self.insurance_cap = Decimal(insurance['cap'])
+            self.third_party_insurance = insurance['third_party_type']
+            self.insurance_premiums = {
+                key: Decimal(value) for key, value in insurance['premiums'].items()
+            }
+
+            self.overtime_tax_free = Decimal(rules['tax_free']['overtime'])
+            self.second_job_tax_free = Decimal(rules['tax_free']['second_job'])
+            self.gratuity_rate = Decimal(rules['gratuity_rate'])
+        except (KeyError, TypeError, InvalidOperation) as e:
+            raise RulesError('Invalid payroll rules for {}: {!r}'.format(year, e))
+
+    # Building blocks, shared by the salary and salary-increase calculators
+
+    def allowance(self, children):
+        return self.personal_allowance + children * self.child_allowance
+
+    def nis(self, basic_salary, gross_pay):
+        base = basic_salary if self.nis_base == 'basic_salary' else gross_pay
+        return min(base * self.nis_rate, self.nis_cap)
+
+    def paye(self, chargeable_income):
+        if chargeable_income <= 0:
+            return ZERO
+        for lower, rate, due in reversed(self.paye_bands):
+            if chargeable_income > lower:
+                return due + (chargeable_income - lower) * rate
+        return ZERO
+
+    def insurance_premium(self, insurance_type, premium=ZERO):
+        if insurance_type == self.third_party_insurance:
+            return premium
+        return self.insurance_premiums.get(insurance_type, ZERO)
+
+    def insurance(self, premium, gross_pay):
+        return min(premium, gross_pay * self.insurance_gross_share, self.insurance_cap)
+
+    def gratuity(self, basic_salary):
+        return basic_salary * self.gratuity_rate
+
+    def calculate(self, basic_salary, taxable_allowances=ZERO,
+                  non_taxable_allowances=ZERO, overtime=ZERO, second_job=ZERO,
+                  insurance_type=None, insurance_premium=ZERO,
+                  loan_deduction=ZERO, gpsu_deduction=ZERO, children=0):
+        """Monthly payroll of one employee; all amounts are Decimals, the
+        result is rounded to cents."""
+        overtime_tax_free = min(overtime, self.overtime_tax_free)
+        second_job_tax_free = min(second_job, self.second_job_tax_free)
+        taxable = taxable_allowances + (overtime - overtime_tax_free) + \
+            (second_job - second_job_tax_free)
+        non_taxable = non_taxable_allowances + overtime_tax_free + second_job_tax_free
+
+        gross_pay = basic_salary + taxable + non_taxable
+        personal_allowance = self.allowance(children)
+        nis = self.nis(basic_salary, gross_pay)
+        insurance = self.insurance(
+            self.insurance_premium(insurance_type, insurance_premium), gross_pay)
+        chargeable = max(ZERO, basic_salary + taxable - personal_allowance - nis - insurance)
+        paye = self.paye(chargeable)
+        deductions = nis + paye + loan_deduction + gpsu_deduction + insurance
+        net_pay = gross_pay - deductions
+        monthly_gratuity = self.gratuity(basic_salary)
+
+        result = {
+            'gross_pay': gross_pay,
+            'net_pay': net_pay,
+            'total_deductions': deductions,
+            'personal_allowance': personal_allowance,
+            'nis_contribution': nis,
+            'insurance_deduction': insurance,
+            'chargeable_income': chargeable,
+            'paye_tax': paye,
+            'overtime_tax_free': overtime_tax_free,
+            'overtime_taxable': overtime - overtime_tax_free,
+            'second_job_tax_free': second_job_tax_free,
+            'second_job_taxable': second_job - second_job_tax_free,
+            'total_taxable_allowances': taxable,
+            'total_non_taxable_allowances': non_taxable,
+            'monthly_net': net_pay,
+            'semi_annual_net': net_pay * 6,
+            'annual_net': net_pay * 12,
+            'monthly_gratuity': monthly_gratuity,
+            'semi_annual_gratuity': monthly_gratuity * 6,
+            'annual_gratuity': monthly_gratuity * 12,
+            # One month's basic salary
+            'vacation_allowance': basic_salary,
+            'net_plus_monthly': net_pay + monthly_gratuity,
+            'net_plus_semi': (net_pay + monthly_gratuity) * 6,
+            'net_plus_annual': (net_pay + monthly_gratuity) * 12,
+            'total_annual_package': (net_pay + monthly_gratuity) * 12 + basic_salary
+        }
+        return {key: _quantize(value, CENT) for key, value in result.items()}
+
+    def solve_basic_salary(self, net_pay, **inputs):
+        """Smallest basic salary whose net pay is at least ``net_pay``, the
+        other ``calculate`` arguments fixed by ``inputs``.
+
+        Net pay is increasing and piecewise linear in the basic salary, so
+        interpolating within a bracket lands on the answer once the bracket
+        is inside one linear piece; bisection steps in between bound the
+        search at the kinks (NIS and insurance caps, PAYE bands). Returns
+        ``(basic_salary, calculate result)``.
+        """
+        try:
+            target = _quantize(net_pay, CENT)
+        except InvalidOperation:
+            raise RulesError('A net pay of {} is out of range'.format(net_pay))
+
+        def evaluate(cents):
+            return self.calculate(Decimal(cents).scaleb(-2), **inputs)
+
+        lo, low = 0, evaluate(0)
+        if low['net_pay'] >= target:
+            return Decimal(0).scaleb(-2), low
+        hi = max(int((target * 200).to_integral_value(ROUND_CEILING)), 100)
+        while True:
+            if hi > MAX_BASIC_CENTS:
+                raise RulesError('A net pay of {} cannot be reached'.format(target))
+            high = evaluate(hi)
+            if high['net_pay'] >= target:
+                break
+            lo, low = hi, high
+            hi *= 2
+
+        interpolate = True
+        while hi - lo > 1:
+            if interpolate:
+                step = ((target - low['net_pay']) * (hi - lo)
+                        / (high['net_pay'] - low['net_pay']))
+                middle = lo + int(step.to_integral_value(ROUND_CEILING))
+                middle = min(max(middle, lo + 1), hi - 1)
+            else:
+                middle = (lo + hi) // 2
+            interpolate = not interpolate
+            result = evaluate(middle)
+            if result['net_pay'] >= target:
+                hi, high = middle, result
+            else:
+                lo, low = middle, result
+        return Decimal(hi).scaleb(-2), high
+
+
+@lru_cache(maxsize=None)
+def rule_sets(path=RULES_PATH):
+    """{year: raw rules} from the rules file, read once."""
+    with open(path) as f:
+        return {int(year): rules for year, rules in json.load(f).items()}
+
+
+def effective_year(year=None, path=RULES_PATH):
+    """Newest rule set year not after ``year`` (default: this year)."""
+    if year is None:
+        year = date.today().year
+    available = [y for y in rule_sets(path) if y <= int(year)]
+    if not available:
+        raise RulesError('No payroll rules for tax year {}'.format(year))
+    return max(available)
+
+
+@lru_cache(maxsize=None)
+def _compile(year, path):
+    return PayrollPlan(year, rule_sets(path)[year])
+
+
+def plan_for(year=None, path=RULES_PATH):
+    """Compiled plan for tax ``year`` (default: the current year)."""
+    return _compile(effective_year(year, path), path)
+
+
+def years(path=RULES_PATH):
+    return sorted(rule_sets(path))
@@ -0,0 +1,154 @@
+# -*- encoding: utf-8 -*-
+"""
+Background system-metrics sampler.
+
+One daemon thread per process refreshes a snapshot of CPU, memory, disk and
+network usage every SAMPLE_INTERVAL seconds. Request handlers read the latest
+snapshot instead of calling psutil themselves, so no request ever blocks on
+psutil.cpu_percent(interval=1).
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+from apps.lazy import lazy_import
+
+psutil = lazy_import('psutil')
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsSampler:
+
+    def __init__(self, interval=2.0, disk_path='/'):
+        self.interval = interval
+        self.disk_path = disk_path
+        self._snapshot = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._listeners = []
+
+    def configure(self, app):
+        self.interval = app.config.get('METRICS_SAMPLE_INTERVAL', self.interval)
+        self.disk_path = app.config.get('METRICS_DISK_PATH', self.disk_path)
+
+    def subscribe(self, listener):
+        """Call ``listener(snapshot)`` from the sampler thread on every reading."""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def _publish(self, snapshot):
+        self._snapshot = snapshot
+        for listener in list(self._listeners):
+            try:
+                listener(snapshot)
+            except Exception:
+                logger.exception('Metrics listener %r failed', listener)
+
+    def sample(self, cpu_interval=None):
+        """Take one reading of every metric (one psutil call per metric)."""
+        cpu_freq = psutil.cpu_freq()
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage(self.disk_path)
+        network = psutil.net_io_counters()
+        now = time.time()
+
+        return {
+            'cpu': {
+                'usage_percent': psutil.cpu_percent(interval=cpu_interval),
+                'frequency': cpu_freq.current if cpu_freq else 'N/A',
+                'cores': psutil.cpu_count()
+            },
+            'memory': {
+                'total': memory.total,
+                'used': memory.used,
+                'percent': memory.percent
+            },
+            'disk': {
+                'total': disk.total,
+                'used': disk.used,
+                'free': disk.free,
+                'percent': disk.percent
+            },
+            'network': {
+                'bytes_sent': network.bytes_sent,
+                'bytes_recv': network.bytes_recv,
+                'packets_sent': network.packets_sent,
+                'packets_recv': network.packets_recv
+            },
+            'time': now,
+            'timestamp': datetime.fromtimestamp(now).isoformat()
+        }
+
+    @property
+    def running(self):
+        return (self._pid == os.getpid()
+                and self._thread is not None
+                and self._thread.is_alive())
+
+    def start(self):
+        """Start the sampling thread (idempotent, safe to call after fork)."""
+        if self.running:
+            return
+
+        with self._lock:
+            if self.running:
+                return
+
+            # The first reading needs a short blocking window for cpu_percent;
+            # afterwards each reading covers the time since the previous one.
+            self._publish(self.sample(cpu_interval=0.1))
+            self._stop.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name='metrics-sampler', daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                snapshot = self.sample()
+            except Exception:
+                # Keep serving the last good snapshot
+                logger.exception('Metrics sample failed')
+                continue
+            self._publish(snapshot)
+
+    def snapshot(self):
+        """Latest reading; starts the sampler on first use in this process."""
+        if not self.running:
+            self.start()
+        return self._snapshot
+
+    def age(self):
+        """Seconds since the latest reading, or None before the first one."""
+        if self._snapshot is None:
+            return None
+        return time.time() - self._snapshot['time']
+
+
+def resource_status(snapshot, threshold=80):
+    """'normal'/'high' per resource and an overall 'healthy'/'warning'."""
+    health_status = {
+        'cpu': 'normal' if snapshot['cpu']['usage_percent'] < threshold else 'high',
+        'memory': 'normal' if snapshot['memory']['percent'] < threshold else 'high',
+        'disk': 'normal' if snapshot['disk']['percent'] < threshold else 'high',
+        'overall': 'healthy'
+    }
+
+    # Set overall status based on individual components
+    if any(status == 'high' for status in health_status.values()):
+        health_status['overall'] = 'warning'
+    return health_status
+
+
+sampler = MetricsSampler()
@@ -0,0 +1,12 @@
+# -*- encoding: utf-8 -*-
+"""
+Speed test and network status
+"""
+
+from flask import Blueprint
+
+blueprint = Blueprint(
+    'speed_test_blueprint',
+    __name__,
+    url_prefix=''
+)
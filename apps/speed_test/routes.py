@@ -0,0 +1,101 @@
+# -*- encoding: utf-8 -*-
+"""
+Speed test and network status
+"""
+
+import socket
+
+from flask import render_template, jsonify
+
+from apps.httpcache import conditional, template_version
+from apps.lazy import lazy_import
+from apps.metrics import observe
+from apps.speed_test import blueprint
+
+speedtest = lazy_import('speedtest')
+
+
+# Speed Test routes
+@blueprint.route('/speedtest')
+@conditional(version=template_version)
+def speedtest_page():
+    return render_template('home/speedtest.html', segment='speedtest')
+
+@blueprint.route('/run-speedtest', methods=['POST'])
+def run_speedtest():
+    try:
+        with observe('speedtest'):
+            st = speedtest.Speedtest()
+
+            # Get server list and select best (also the server information)
+            server_info = st.get_best_server()
+
+            # Track progress
+            progress = {
+                'download': 0,
+                'upload': 0,
+                'ping': 0
+            }
+
+            # Download Speed
+            download_speed = st.download() / 1_000_000  # Convert to Mbps
+            progress['download'] = 100
+
+            # Upload Speed
+            upload_speed = st.upload() / 1_000_000  # Convert to Mbps
+            progress['upload'] = 100
+
+            # Ping
+            ping = st.results.ping
+            progress['ping'] = 100
+        
+        return jsonify({
+            'success': True,
+            'results': {
+                'download': round(download_speed, 2),
+                'upload': round(upload_speed, 2),
+                'ping': round(ping, 2),
+                'server': {
+                    'name': server_info['sponsor'],
+                    'location': f"{server_info['city']}, {server_info['country']}",
+                    'host': server_info['host']
+                }
+            }
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+
+# Network Status Route
+@blueprint.route('/api/network-status')
+def get_network_status():
+    try:
+        # Get basic network information
+        hostname = socket.gethostname()
+        local_ip = socket.gethostbyname(hostname)
+        
+        # Perform speed test
+        with observe('speedtest'):
+            st = speedtest.Speedtest()
+            st.get_best_server()
+            download_speed = st.download() / 1_000_000  # Convert to Mbps
+            upload_speed = st.upload() / 1_000_000      # Convert to Mbps
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'hostname': hostname,
+                'local_ip': local_ip,
+                'download_speed': download_speed,
+                'upload_speed': upload_speed,
+                'ping': st.results.ping
+            }
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
@@ -189,21 +189,64 @@ const DashboardWidgets = {
     },
 
     initSystemMonitor() {
-        const updateSystemStats = () => {
-            // Memory usage simulation
-            const memoryUsage = Math.floor(Math.random() * 30) + 70; // 70-100%
-            const cpuUsage = Math.floor(Math.random() * 40) + 30; // 30-70%
+        // Live metrics pushed by the server: one full snapshot, then only
+        // the fields that changed (see /ws/dashboard)
+        const metrics = {};
+
+        const render = () => {
+            const memoryUsage = metrics['memory.percent'];
+            const cpuUsage = metrics['cpu.usage_percent'];
+            if (memoryUsage === undefined || cpuUsage === undefined) return;
 
-            // Update system stats display
             this.updateSystemStats({
                 memory: memoryUsage,
                 cpu: cpuUsage,
-                status: memoryUsage > 90 ? 'High Load' : 'Normal'
+                status: memoryUsage > 90 || cpuUsage > 90 ? 'High Load' : 'Normal'
             });
         };
 
-        updateSystemStats();
-        setInterval(updateSystemStats, 5000);
+        // Polling: for browsers without Server-Sent Events, and when the
+        // server has no stream to spare (it answers 503)
+        const pollSystemStats = async () => {
+            try {
+                const response = await fetch('/api/system-info');
+                const result = await response.json();
+                if (result.success) {
+                    metrics['memory.percent'] = result.data.memory.percent;
+                    metrics['cpu.usage_percent'] = result.data.cpu.usage_percent;
+                    render();
+                }
+            } catch (error) {
+                console.error('Error fetching system stats:', error);
+            }
+        };
+        const startPolling = () => {
+            pollSystemStats();
+            setInterval(pollSystemStats, 5000);
+        };
+
+        if (window.EventSource) {
+            const source = new EventSource('/ws/dashboard');
+            source.addEventListener('snapshot', (event) => {
+                Object.keys(metrics).forEach(key => delete metrics[key]);
+                Object.assign(metrics, JSON.parse(event.data));
+                render();
+            });
+            source.addEventListener('delta', (event) => {
+                Object.assign(metrics, JSON.parse(event.data));
+                render();
+            });
+            // A stream that ends is reopened by the browser; a refused one
+            // (an error status) is closed for good
+            source.addEventListener('error', () => {
+                if (source.readyState === EventSource.CLOSED) {
+                    startPolling();
+                }
+            });
+            return;
+        }
+
+        startPolling();
     },
 
     initNetworkMonitor() {
@@ -5,6 +5,7 @@ const VehicleImport = {
         this.currentCurrency = 'GYD';
         this.exchangeRate = 208.50;
         this.lastCalculation = null;
+        this.grid = null;
 
         // Cache DOM elements
         this.elements = {
@@ -34,6 +35,11 @@ const VehicleImport = {
         // Form submission
         this.form.addEventListener('submit', (e) => this.calculateImport(e));
 
+        // Switching a dropdown re-reads the quote grid
+        this.form.querySelectorAll('select').forEach(select => {
+            select.addEventListener('change', () => this.onOptionChange());
+        });
+
         // Currency switch buttons
         const gydBtn = document.querySelector('[data-currency="GYD"]');
         const usdBtn = document.querySelector('[data-currency="USD"]');
@@ -57,25 +63,11 @@ const VehicleImport = {
             }
 
             const formData = new FormData(this.form);
-            const response = await fetch('/calculate-import', {
-                method: 'POST',
-                body: formData
-            });
-
-            if (!response.ok) {
-                throw new Error(`HTTP error! status: ${response.status}`);
-            }
-
-            const data = await response.json();
-            console.log('Received data:', data); // Debug log
-
-            if (!data.success) {
-                throw new Error(data.error || 'Calculation failed');
-            }
+            const calculations = this.lookupQuote(formData) || await this.fetchQuote(formData);
 
             this.lastCalculation = {
                 formData: Object.fromEntries(formData),
-                calculations: data.calculations
+                calculations: calculations
             };
 
             this.displayResults();
@@ -91,6 +83,64 @@ const VehicleImport = {
         }
     },
 
+    // The quote grid holds the calculations of every age, vehicle type,
+    // propulsion and engine size for one CIF and exchange rate, so changing
+    // a dropdown needs no further request
+    gridKey(formData) {
+        return `${formData.get('cif')}|${formData.get('exchange_rate')}`;
+    },
+
+    lookupQuote(formData) {
+        if (!this.grid || this.grid.key !== this.gridKey(formData)) return null;
+        const byType = this.grid.data[formData.get('vehicle_age')] || {};
+        const byPropulsion = byType[formData.get('vehicle_type')] || {};
+        const byEngine = byPropulsion[formData.get('propulsion')] || {};
+        return byEngine[formData.get('engine_cc')] || null;
+    },
+
+    async fetchQuote(formData) {
+        const params = new URLSearchParams({
+            cif: formData.get('cif'),
+            exchange_rate: formData.get('exchange_rate')
+        });
+        const response = await fetch(`/calculate-import-grid?${params}`);
+        if (response.ok) {
+            const data = await response.json();
+            if (data.success) {
+                this.grid = { key: this.gridKey(formData), data: data.grid };
+                const calculations = this.lookupQuote(formData);
+                if (calculations) return calculations;
+            }
+        }
+
+        // A choice the grid does not cover: price it on its own
+        const single = await fetch('/calculate-import', {
+            method: 'POST',
+            body: formData
+        });
+        if (!single.ok) {
+            throw new Error(`HTTP error! status: ${single.status}`);
+        }
+        const data = await single.json();
+        if (!data.success) {
+            throw new Error(data.error || 'Calculation failed');
+        }
+        return data.calculations;
+    },
+
+    onOptionChange() {
+        // Only refresh results that are already on screen
+        if (!this.lastCalculation) return;
+        const formData = new FormData(this.form);
+        const calculations = this.lookupQuote(formData);
+        if (!calculations) return;
+        this.lastCalculation = {
+            formData: Object.fromEntries(formData),
+            calculations: calculations
+        };
+        this.displayResults();
+    },
+
     displayResults() {
         if (!this.lastCalculation) return;
 
@@ -0,0 +1,93 @@
+# -*- encoding: utf-8 -*-
+"""
+Template compilation and fragment caching.
+
+Compiled templates are kept in a bytecode cache directory shared by all
+workers of the host (private to the user running them), so a new worker loads them
+instead of parsing and compiling the sources again. With
+TEMPLATE_PRECOMPILE every template is compiled at startup; under gunicorn's
+preload_app that happens once in the master and the workers inherit the
+result.
+
+Layout includes that only depend on a few context values (the sidenav on
+``segment``) are rendered once per combination through
+``cached_include('includes/sidenav.html', segment=segment)``.
+"""
+
+import logging
+
+from flask import render_template
+from jinja2 import FileSystemBytecodeCache, TemplateError
+from markupsafe import Markup
+
+from apps.paths import private_directory
+
+logger = logging.getLogger(__name__)
+
+
+def configure_bytecode_cache(app):
+    """Jinja's per-user cache directory (0700, ownership checked by Jinja)
+    unless JINJA_BYTECODE_CACHE_DIR names one. Bytecode is executed as it is
+    loaded, so a directory others could write to leaves the cache off."""
+    if not app.config.get('JINJA_BYTECODE_CACHE', True):
+        return
+    directory = app.config.get('JINJA_BYTECODE_CACHE_DIR')
+    try:
+        if directory:
+            cache = FileSystemBytecodeCache(private_directory(directory))
+        else:
+            cache = FileSystemBytecodeCache()
+    except (OSError, RuntimeError) as e:
+        logger.error('Jinja bytecode cache disabled: %s', e)
+        return
+    app.jinja_env.bytecode_cache = cache
+
+
+def precompile_templates(app):
+    """Load every template into the environment (and bytecode) cache."""
+    env = app.jinja_env
+    names = env.list_templates(extensions=('html',))
+    # Keep them all: the default LRU of 400 would evict some again
+    if env.cache is not None and env.cache.capacity < len(names):
+        env.cache.capacity = len(names)
+
+    loaded = 0
+    for name in names:
+        try:
+            env.get_template(name)
+            loaded += 1
+        except TemplateError:
+            logger.exception('Could not precompile template %s', name)
+    return loaded
+
+
+class FragmentCache:
+    """Rendered includes keyed by template name and context values."""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.enabled = True
+        self._fragments = {}
+
+    def init_app(self, app):
+        # Templates and assets may change underneath a debug server
+        self.enabled = not (app.debug or app.templates_auto_reload)
+        app.add_template_global(self.include, 'cached_include')
+
+    def include(self, name, **context):
+        if not self.enabled:
+            return Markup(render_template(name, **context))
+
+        key = (name,) + tuple(sorted(context.items()))
+        fragment = self._fragments.get(key)
+        if fragment is None:
+            if len(self._fragments) >= self.maxsize:
+                self._fragments.clear()
+            fragment = self._fragments[key] = Markup(render_template(name, **context))
+        return fragment
+
+    def clear(self):
+        self._fragments.clear()
+
+
+fragments = FragmentCache()
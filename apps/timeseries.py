@@ -0,0 +1,186 @@
+# -*- encoding: utf-8 -*-
+"""
+In-memory time-series store for the dashboard metrics.
+
+Every sampler reading is folded into a few fixed-size ring buffers of
+different resolution (1s, 1m, 1h by default). Each ring is a set of
+``array('d')`` columns, so memory use is fixed at startup and does not grow
+with uptime.
+"""
+
+import re
+import threading
+import time
+from array import array
+
+FIELDS = ('cpu', 'memory', 'disk', 'net_sent', 'net_recv')
+
+# (resolution in seconds, number of buckets kept)
+DEFAULT_TIERS = (
+    (1, 3600),      # 1 hour at 1 second
+    (60, 1440),     # 1 day at 1 minute
+    (3600, 720)     # 30 days at 1 hour
+)
+
+_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+_DURATION = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*$')
+
+
+def parse_duration(value):
+    """Parse '90', '30s', '15m', '6h' or '7d' into seconds."""
+    match = _DURATION.match(value or '')
+    if not match:
+        raise ValueError('Invalid duration: {!r}'.format(value))
+    seconds = float(match.group(1)) * _UNITS[match.group(2) or 's']
+    if seconds <= 0:
+        raise ValueError('Duration must be positive: {!r}'.format(value))
+    return seconds
+
+
+class RingTier:
+    """Fixed-capacity ring of per-bucket means at one resolution."""
+
+    def __init__(self, resolution, capacity, fields=FIELDS):
+        self.resolution = resolution
+        self.capacity = capacity
+        self.fields = fields
+        self.times = array('d', bytes(8 * capacity))
+        self.columns = [array('d', bytes(8 * capacity)) for _ in fields]
+        self.head = 0
+        self.size = 0
+
+        # Bucket currently being accumulated
+        self._bucket = None
+        self._sums = [0.0] * len(fields)
+        self._count = 0
+
+    def add(self, timestamp, values):
+        bucket = int(timestamp // self.resolution)
+        if bucket != self._bucket:
+            if self._count:
+                self._flush()
+            self._bucket = bucket
+            self._sums = [0.0] * len(self.fields)
+            self._count = 0
+
+        for i, value in enumerate(values):
+            self._sums[i] += value
+        self._count += 1
+
+    def _flush(self):
+        self.times[self.head] = self._bucket * self.resolution
+        for i, column in enumerate(self.columns):
+            column[self.head] = self._sums[i] / self._count
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    @property
+    def retention(self):
+        return self.resolution * self.capacity
+
+    def points(self, since):
+        """(timestamp, values) oldest first, including the open bucket."""
+        start = self.head - self.size
+        for offset in range(self.size):
+            i = (start + offset) % self.capacity
+            if self.times[i] >= since:
+                yield self.times[i], [column[i] for column in self.columns]
+
+        if self._count and self._bucket * self.resolution >= since:
+            yield (self._bucket * self.resolution,
+                   [total / self._count for total in self._sums])
+
+    def nbytes(self):
+        return (len(self.columns) + 1) * self.capacity * self.times.itemsize
+
+
+class TimeSeriesStore:
+
+    def __init__(self, tiers=DEFAULT_TIERS, fields=FIELDS):
+        self.fields = fields
+        self.tiers = [RingTier(res, cap, fields) for res, cap in tiers]
+        self._lock = threading.Lock()
+        self._last_network = None
+
+    def add(self, snapshot):
+        """Record one sampler snapshot (see apps.sampler)."""
+        timestamp = snapshot['time']
+        network = snapshot['network']
+
+        # Network counters are stored as byte rates so that rollups stay
+        # meaningful; the first reading has nothing to diff against.
+        sent_rate = recv_rate = 0.0
+        if self._last_network is not None:
+            last_time, last_sent, last_recv = self._last_network
+            elapsed = timestamp - last_time
+            if elapsed > 0:
+                sent_rate = max(0, network['bytes_sent'] - last_sent) / elapsed
+                recv_rate = max(0, network['bytes_recv'] - last_recv) / elapsed
+        self._last_network = (
+            timestamp, network['bytes_sent'], network['bytes_recv']
+        )
+
+        values = (
+            snapshot['cpu']['usage_percent'],
+            snapshot['memory']['percent'],
+            snapshot['disk']['percent'],
+            sent_rate,
+            recv_rate
+        )
+        with self._lock:
+            for tier in self.tiers:
+                tier.add(timestamp, values)
+
+    def select_tier(self, range_seconds, step=None):
+        """Coarsest tier not exceeding ``step`` among those whose retention
+        covers ``range_seconds`` (the finest such tier if no step is given)."""
+        candidates = [t for t in self.tiers if t.retention >= range_seconds]
+        if not candidates:
+            candidates = [self.tiers[-1]]
+        if step:
+            coarse_enough = [t for t in candidates if t.resolution <= step]
+            if coarse_enough:
+                return coarse_enough[-1]
+        return candidates[0]
+
+    def query(self, range_seconds, step=None, now=None):
+        """Series for the last ``range_seconds``, one point per ``step``."""
+        tier = self.select_tier(range_seconds, step)
+        step = max(step or tier.resolution, tier.resolution)
+        if now is None:
+            now = time.time()
+
+        with self._lock:
+            points = list(tier.points(now - range_seconds))
+
+        series = {'timestamps': []}
+        series.update((field, []) for field in self.fields)
+
+        bucket = None
+        sums = count = None
+        for timestamp, values in points + [(None, None)]:
+            current = None if timestamp is None else int(timestamp // step)
+            if current != bucket and count:
+                series['timestamps'].append(bucket * step)
+                for i, field in enumerate(self.fields):
+                    series[field].append(round(sums[i] / count, 2))
+            if timestamp is None:
+                break
+            if current != bucket:
+                bucket, sums, count = current, [0.0] * len(values), 0
+            for i, value in enumerate(values):
+                sums[i] += value
+            count += 1
+
+        return {
+            'range': range_seconds,
+            'step': step,
+            'resolution': tier.resolution,
+            'series': series
+        }
+
+    def nbytes(self):
+        return sum(tier.nbytes() for tier in self.tiers)
+
+
+metrics_history = TimeSeriesStore()
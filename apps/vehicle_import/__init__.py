@@ -0,0 +1,12 @@
+# -*- encoding: utf-8 -*-
+"""
+Vehicle import duty calculator
+"""
+
+from flask import Blueprint
+
+blueprint = Blueprint(
+    'vehicle_import_blueprint',
+    __name__,
+    url_prefix=''
+)
@@ -0,0 +1,186 @@
+# -*- encoding: utf-8 -*-
+"""
+Vehicle import duty calculator
+"""
+
+import json
+import math
+from datetime import date
+
+from flask import Response, current_app, render_template, request, jsonify
+
+from apps.httpcache import conditional, template_version
+from apps.metrics import observe
+from apps.vehicle_import import blueprint, fleet
+from apps.vehicle_import.tariffs import TariffError, tariffs
+
+
+@blueprint.record_once
+def configure_tariffs(state):
+    tariffs.init_app(state.app)
+
+
+@blueprint.route('/vehicle-import')
+@conditional(version=template_version)
+def vehicle_import():
+    return render_template('home/vehicle-import.html', segment='vehicle-import')
+
+@blueprint.route('/calculate-import', methods=['POST'])
+def calculate_import():
+    try:
+        # Get form data with validation
+        if not request.form:
+            return jsonify({
+                'success': False,
+                'error': 'No form data provided'
+            }), 400
+
+        # Extract and validate required fields
+        try:
+            cif_usd = float(request.form.get('cif', 0))
+            exchange_rate = float(request.form.get('exchange_rate', 208.50))
+            vehicle_age = request.form.get('vehicle_age')
+            vehicle_type = request.form.get('vehicle_type')
+            propulsion = request.form.get('propulsion')
+            engine_cc = request.form.get('engine_cc')
+        except (ValueError, TypeError) as e:
+            return jsonify({
+                'success': False,
+                'error': 'Invalid numeric value provided'
+            }), 400
+
+        # Validate required fields
+        if not all([cif_usd, vehicle_age, vehicle_type, propulsion, engine_cc]):
+            return jsonify({
+                'success': False,
+                'error': 'All fields are required'
+            }), 400
+
+        # Schedule in force on the clearance date (default: today)
+        clearance_date = request.form.get('clearance_date')
+        book = tariffs.current()
+        schedule = book.schedule_for(
+            date.fromisoformat(clearance_date) if clearance_date else None)
+
+        # Convert CIF to GYD
+        cif_gyd = round(cif_usd * exchange_rate, 2)
+
+        taxes = schedule.calculate(
+            cif_gyd, exchange_rate, vehicle_age, vehicle_type, propulsion, engine_cc)
+        total_cost = cif_gyd + sum(taxes.values())
+
+        # Return formatted response
+        return jsonify({
+            'success': True,
+            'tariff_version': book.version,
+            'calculations': {
+                'cif_gyd': round(cif_gyd, 2),
+                'custom_duty': round(taxes['custom_duty'], 2),
+                'environmental_tax': round(taxes['environmental_tax'], 2),
+                'excise_tax': round(taxes['excise_tax'], 2),
+                'vat': round(taxes['vat'], 2),
+                'total_cost': round(total_cost, 2)
+            }
+        })
+
+    except Exception as e:
+        print(f"Error in calculate_import: {str(e)}")  # For debugging
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@blueprint.route('/calculate-import-grid', methods=['GET', 'POST'])
+@conditional()
+def calculate_import_grid():
+    """Calculations for one CIF and exchange rate for every combination of
+    the form's choices, so the page can switch them without a request."""
+    try:
+        cif_usd = float(request.values.get('cif') or 0)
+        exchange_rate = float(request.values.get('exchange_rate') or 208.50)
+        if not (0 < cif_usd < math.inf and 0 < exchange_rate < math.inf):
+            raise ValueError('cif and exchange_rate must be positive numbers')
+
+        clearance_date = request.values.get('clearance_date')
+        book = tariffs.current()
+        schedule = book.schedule_for(
+            date.fromisoformat(clearance_date) if clearance_date else None)
+        options, grid = fleet.quote_grid(schedule, cif_usd, exchange_rate, book.vehicle_types)
+    except (fleet.FleetInputError, TariffError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+    return jsonify({
+        'success': True,
+        'tariff_version': book.version,
+        'cif': cif_usd,
+        'exchange_rate': exchange_rate,
+        'options': options,
+        'grid': grid
+    })
+
+@blueprint.route('/calculate-import-batch', methods=['POST'])
+def calculate_import_batch():
+    """Landed cost of every vehicle of a shipment.
+
+    Either an uploaded CSV/XLSX sheet (form fields exchange_rate and
+    clearance_date apply to all rows) or a JSON body
+    ``{"vehicles": [...], "exchange_rate": ..., "clearance_date": ...}``
+    or just the list of vehicles. Vehicles have the calculate-import fields
+    cif, vehicle_age, vehicle_type, propulsion and engine_cc (a band or a
+    number of cc), and optionally reference, vin, description and their
+    own exchange_rate.
+    """
+    try:
+        upload = request.files.get('file')
+        if upload is not None and upload.filename:
+            options = request.form
+            frame = fleet.read_sheet(upload.stream, upload.filename)
+        else:
+            options = request.get_json(silent=True) or {}
+            # A bare list is the vehicles, with the default options
+            if isinstance(options, list):
+                options = {'vehicles': options}
+            elif not isinstance(options, dict):
+                raise fleet.FleetInputError('Upload a file or post a list of vehicles')
+            vehicles = options.get('vehicles')
+            if not isinstance(vehicles, list) or not vehicles:
+                raise fleet.FleetInputError('Upload a file or post a list of vehicles')
+            frame = fleet.read_records(vehicles)
+
+        max_rows = current_app.config.get('VEHICLE_BATCH_MAX_ROWS', 100000)
+        if len(frame) > max_rows:
+            raise fleet.FleetInputError('At most {} vehicles per request'.format(max_rows))
+
+        exchange_rate = float(options.get('exchange_rate') or 208.50)
+        if not math.isfinite(exchange_rate) or exchange_rate <= 0:
+            raise ValueError('exchange_rate must be a positive number')
+        clearance_date = options.get('clearance_date')
+        if clearance_date and not isinstance(clearance_date, str):
+            raise ValueError('clearance_date must be a YYYY-MM-DD date')
+
+        book = tariffs.current()
+        schedule = book.schedule_for(
+            date.fromisoformat(clearance_date) if clearance_date else None)
+        with observe('vehicle_import_batch'):
+            result = fleet.landed_cost(frame, schedule, exchange_rate)
+    except (fleet.FleetInputError, TariffError, TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+    # The rows are serialised by pandas: for tens of thousands of vehicles
+    # to_dict() + jsonify take several times longer than the calculation
+    head = json.dumps({
+        'success': True,
+        'tariff_version': book.version,
+        'count': len(result),
+        'totals': fleet.totals(result)
+    })
+    return Response(
+        head[:-1] + ', "vehicles": ' + result.to_json(orient='records') + '}',
+        mimetype='application/json'
+    )
@@ -0,0 +1,240 @@
+# -*- encoding: utf-8 -*-
+"""
+Vehicle import tariff schedules.
+
+The schedules live in tariffs.json next to this module (or the file named
+by VEHICLE_TARIFFS_PATH). Each schedule applies from its ``effective`` date
+until the next one, so a budget change is a new schedule appended to the
+file. A schedule holds, per vehicle age (``new``/``old``), propulsion and
+engine cc band, one of three tariff kinds:
+
+* ``{"duty", "excise", "vat"}``: rates on CIF, CIF + duty and
+  CIF + duty + excise;
+* ``{"fixed"}``: a fixed excise amount in GYD;
+* ``{"deemed_usd", "rate"}``: excise of (CIF + deemed) x rate + deemed,
+  with the deemed amount given in USD.
+
+``"*"`` matches any other propulsion or band, and a string value is an
+alias for a sibling entry (``"*": "diesel"``).
+
+The file is compiled into a flat index keyed by (age, propulsion, band).
+``tariffs.current()`` checks the file's modification time at most every
+TARIFF_RELOAD_INTERVAL seconds and swaps in a new compilation when it
+changed, so every worker picks up an edited file without a restart; a file
+that does not compile is logged and the previous tariffs stay in use.
+"""
+
+import bisect
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import namedtuple
+from datetime import date
+
+logger = logging.getLogger(__name__)
+
+TARIFFS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tariffs.json')
+
+AGES = ('new', 'old')
+ANY = '*'
+
+
+class TariffError(ValueError):
+    pass
+
+
+Tariff = namedtuple('Tariff', 'duty excise vat fixed deemed_usd rate')
+
+
+def _tariff(entry):
+    if 'fixed' in entry:
+        return Tariff(0.0, 0.0, 0.0, float(entry['fixed']), None, None)
+    if 'deemed_usd' in entry:
+        return Tariff(0.0, 0.0, 0.0, None, float(entry['deemed_usd']), float(entry['rate']))
+    return Tariff(float(entry['duty']), float(entry['excise']), float(entry['vat']),
+                  None, None, None)
+
+
+def _resolve(table, key, seen=()):
+    value = table[key]
+    if isinstance(value, str):
+        if value in seen or value not in table:
+            raise TariffError('Bad alias {!r} -> {!r}'.format(key, value))
+        return _resolve(table, value, seen + (key,))
+    return value
+
+
+def _band_range(band):
+    try:
+        if band.endswith('+'):
+            return int(band[:-1]), math.inf, band
+        low, high = band.split('-')
+        return int(low), int(high), band
+    except ValueError:
+        return None
+
+
+class Schedule:
+    """One compiled tariff schedule."""
+
+    def __init__(self, rules):
+        try:
+            effective = rules.get('effective')
+            self.effective = date.fromisoformat(effective) if effective else None
+            self.exempt_propulsion = frozenset(rules.get('exempt_propulsion', ()))
+            environmental = rules['environmental_tax']
+            self.environmental_tax = float(environmental['amount'])
+            self.environmental_exempt = frozenset(
+                environmental.get('exempt_vehicle_types', ()))
+
+            # (age, propulsion, band) -> Tariff
+            self.index = {}
+            for age in AGES:
+                propulsions = rules[age]
+                for propulsion in propulsions:
+                    bands = _resolve(propulsions, propulsion)
+                    for band in bands:
+                        self.index[age, propulsion, band] = _tariff(_resolve(bands, band))
+
+            # Named (not wildcard) choices, in file order
+            self.propulsions = list(dict.fromkeys(
+                [p for _, p, _ in self.index if p != ANY] + sorted(self.exempt_propulsion)))
+            self.bands = list(dict.fromkeys(b for _, _, b in self.index if b != ANY))
+            # (low, high, band) of the bands named like "1001-1500" or "3000+"
+            self.band_ranges = [r for r in map(_band_range, self.bands) if r]
+        except (KeyError, TypeError, ValueError) as e:
+            raise TariffError('Invalid tariff schedule: {!r}'.format(e))
+
+    def band_for(self, engine_cc):
+        """Name of the band holding an engine size in cc (None if none)."""
+        if not math.isfinite(engine_cc):
+            return None
+        cc = math.ceil(engine_cc)
+        for low, high, band in self.band_ranges:
+            if low <= cc <= high:
+                return band
+        return None
+
+    def band(self, engine_cc):
+        """Band of an engine_cc input: a band name as it is, a number of cc
+        as the band holding it. Anything else is a TariffError, never the
+        ``*`` wildcard, which would price a typo at its fallback rates."""
+        label = str(engine_cc).strip()
+        if label in self.bands:
+            return label
+        try:
+            band = self.band_for(float(label))
+        except ValueError:
+            band = None
+        if band is None:
+            raise TariffError('engine_cc {!r} is not a cc number or one of the bands {}'.format(
+                label, ', '.join(self.bands)))
+        return band
+
+    def tariff(self, age, propulsion, band):
+        index = self.index
+        for key in ((age, propulsion, band), (age, propulsion, ANY),
+                    (age, ANY, band), (age, ANY, ANY)):
+            if key in index:
+                return index[key]
+        raise TariffError('No tariff for {} {} {}'.format(age, propulsion, band))
+
+    def calculate(self, cif_gyd, exchange_rate, vehicle_age, vehicle_type,
+                  propulsion, engine_cc):
+        """Duty, excise, environmental tax and VAT in GYD (unrounded)."""
+        if propulsion in self.exempt_propulsion:
+            return {'custom_duty': 0, 'excise_tax': 0, 'environmental_tax': 0, 'vat': 0}
+
+        tariff = self.tariff(vehicle_age, propulsion, self.band(engine_cc))
+        if tariff.fixed is not None:
+            duty, excise, vat = 0, tariff.fixed, 0
+        elif tariff.deemed_usd is not None:
+            deemed = tariff.deemed_usd * exchange_rate
+            duty, excise, vat = 0, (cif_gyd + deemed) * tariff.rate + deemed, 0
+        else:
+            duty = cif_gyd * tariff.duty
+            excise = (cif_gyd + duty) * tariff.excise
+            vat = (cif_gyd + duty + excise) * tariff.vat
+
+        environmental = 0
+        if vehicle_type not in self.environmental_exempt:
+            environmental = self.environmental_tax
+        return {'custom_duty': duty, 'excise_tax': excise,
+                'environmental_tax': environmental, 'vat': vat}
+
+
+class Tariffs:
+    """All schedules of one tariffs file, by effective date."""
+
+    def __init__(self, data):
+        try:
+            self.version = str(data['version'])
+            self.vehicle_types = list(data.get('vehicle_types', ()))
+            schedules = [Schedule(rules) for rules in data['schedules']]
+        except (KeyError, TypeError) as e:
+            raise TariffError('Invalid tariffs file: {!r}'.format(e))
+        if not schedules:
+            raise TariffError('The tariffs file has no schedules')
+        schedules.sort(key=lambda s: s.effective or date.min)
+        self.schedules = schedules
+        self._starts = [s.effective or date.min for s in schedules]
+
+    def schedule_for(self, day=None):
+        """Schedule in force on ``day`` (default: today)."""
+        position = bisect.bisect_right(self._starts, day or date.today())
+        if position == 0:
+            raise TariffError('No tariffs in force on {}'.format(day))
+        return self.schedules[position - 1]
+
+
+class TariffBook:
+    """The current Tariffs, reloaded when the file changes."""
+
+    def __init__(self, path=TARIFFS_PATH, interval=1.0):
+        self.path = path
+        self.interval = interval
+        self._tariffs = None
+        self._stamp = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.path = app.config.get('VEHICLE_TARIFFS_PATH') or TARIFFS_PATH
+        self.interval = app.config.get('TARIFF_RELOAD_INTERVAL', 1.0)
+        with self._lock:
+            self._tariffs = None
+
+    def _load(self):
+        with open(self.path) as f:
+            tariffs = Tariffs(json.load(f))
+        # A single assignment: requests see the old or the new tariffs
+        self._tariffs = tariffs
+        logger.info('Loaded vehicle tariffs %s from %s', tariffs.version, self.path)
+
+    def current(self):
+        tariffs = self._tariffs
+        if tariffs is not None and time.monotonic() - self._checked_at < self.interval:
+            return tariffs
+
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                info = os.stat(self.path)
+                stamp = (info.st_mtime_ns, info.st_size)
+                if self._tariffs is None or stamp != self._stamp:
+                    # Also remembered on failure: a broken file is
+                    # reported once, not on every check
+                    self._stamp = stamp
+                    self._load()
+            except (OSError, ValueError) as e:
+                if self._tariffs is None:
+                    raise TariffError('Cannot load vehicle tariffs: {}'.format(e))
+                logger.error('Keeping vehicle tariffs %s, reload failed: %s',
+                             self._tariffs.version, e)
+            return self._tariffs
+
+
+tariffs = TariffBook()
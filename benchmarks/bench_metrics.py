@@ -0,0 +1,91 @@
+# -*- encoding: utf-8 -*-
+"""
+Latency of the dashboard metrics endpoints: blocking psutil calls (the
+previous implementation) versus reading the background sampler snapshot.
+
+    python benchmarks/bench_metrics.py [--requests 500]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import psutil  # noqa: E402
+
+from apps import create_app  # noqa: E402
+from apps.config import config_dict  # noqa: E402
+from apps.sampler import sampler  # noqa: E402
+
+ENDPOINTS = (
+    '/api/system-info',
+    '/api/health-check',
+    '/api/performance-metrics'
+)
+
+
+def legacy_performance_metrics():
+    """What /api/performance-metrics did per request before the sampler."""
+    return {
+        'cpu': {
+            'usage': psutil.cpu_percent(interval=1),
+            'frequency': psutil.cpu_freq().current if psutil.cpu_freq() else 'N/A',
+            'cores': psutil.cpu_count()
+        },
+        'memory': {
+            'total': psutil.virtual_memory().total,
+            'used': psutil.virtual_memory().used,
+            'percent': psutil.virtual_memory().percent
+        },
+        'disk': {
+            'total': psutil.disk_usage('/').total,
+            'used': psutil.disk_usage('/').used,
+            'percent': psutil.disk_usage('/').percent
+        },
+        'network': {
+            'bytes_sent': psutil.net_io_counters().bytes_sent,
+            'bytes_recv': psutil.net_io_counters().bytes_recv
+        }
+    }
+
+
+def timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def report(label, samples):
+    samples = sorted(samples)
+    print('{:<34} n={:<5} median={:>10.1f}us  p99={:>10.1f}us'.format(
+        label, len(samples),
+        statistics.median(samples) * 1e6,
+        samples[int(len(samples) * 0.99) - 1 if len(samples) > 1 else 0] * 1e6))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--legacy-requests', type=int, default=3)
+    args = parser.parse_args()
+
+    report('legacy psutil (per request)',
+           timed(legacy_performance_metrics, args.legacy_requests))
+
+    app = create_app(config_dict['Debug'])
+    client = app.test_client()
+    client.get(ENDPOINTS[0])  # start the sampler
+
+    report('sampler.snapshot()', timed(sampler.snapshot, args.requests))
+    for endpoint in ENDPOINTS:
+        report(endpoint, timed(lambda: client.get(endpoint), args.requests))
+
+
+if __name__ == '__main__':
+    main()
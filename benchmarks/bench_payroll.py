@@ -0,0 +1,114 @@
+# -*- encoding: utf-8 -*-
+"""
+Cost of one payroll calculation: the previous inline float code of
+calculate_salary versus the compiled Decimal rule plan, plus the one-off
+cost of loading and compiling a tax year.
+
+    python benchmarks/bench_payroll.py [--calculations 20000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apps.salary import rules  # noqa: E402
+from apps.salary.rules import money  # noqa: E402
+
+
+def legacy_calculate(basic_salary, taxable_allowances, non_taxable_allowances,
+                     overtime_amount, second_job_income, insurance_type,
+                     insurance_premium, loan_deduction, gpsu_deduction,
+                     num_children):
+    """The 2025 float arithmetic calculate_salary used to inline."""
+    overtime_tax_free = min(overtime_amount, 50000)
+    taxable_overtime = max(0, overtime_amount - overtime_tax_free)
+    second_job_tax_free = min(second_job_income, 50000)
+    taxable_second_job = max(0, second_job_income - second_job_tax_free)
+    if insurance_type != '5':
+        insurance_premium = {'1': 0, '2': 1469, '3': 3182, '4': 4970}.get(insurance_type, 0)
+    total_taxable = taxable_allowances + taxable_overtime + taxable_second_job
+    total_non_taxable = non_taxable_allowances + overtime_tax_free + second_job_tax_free
+    gross_pay = basic_salary + total_taxable + total_non_taxable
+    personal_allowance = 130000 + (num_children * 10000)
+    nis = min(basic_salary * 0.056, 15680)
+    insurance = min(insurance_premium, gross_pay * 0.1, 50000)
+    chargeable = max(0, basic_salary + total_taxable - personal_allowance - nis - insurance)
+    paye = chargeable * 0.25
+    deductions = nis + paye + loan_deduction + gpsu_deduction + insurance
+    return {
+        'gross_pay': round(gross_pay, 2),
+        'net_pay': round(gross_pay - deductions, 2),
+        'paye_tax': round(paye, 2),
+        'total_annual_package': round(
+            (gross_pay - deductions) * 12 + basic_salary * 0.225 * 12 + basic_salary, 2)
+    }
+
+
+def employees(count, seed=1):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield (
+            rng.randint(60000, 900000), rng.choice([0, 15000, 42000.5]),
+            rng.choice([0, 10000]), rng.choice([0, 30000, 80000]),
+            rng.choice([0, 65000]), rng.choice('12345'),
+            rng.choice([0, 7500, 60000]), rng.choice([0, 5000]),
+            rng.choice([0, 1200]), rng.randint(0, 3)
+        )
+
+
+def timed(label, func, inputs):
+    start = time.perf_counter()
+    for args in inputs:
+        func(*args)
+    elapsed = time.perf_counter() - start
+    print('{:<32} {:>8.2f} us/calculation'.format(label, elapsed / len(inputs) * 1e6))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--calculations', type=int, default=20000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rules.rule_sets.cache_clear()
+    rules._compile.cache_clear()
+    plan = rules.plan_for(2025)
+    print('{:<32} {:>8.2f} ms (once per process)'.format(
+        'load + compile 2025 rules', (time.perf_counter() - start) * 1e3))
+
+    start = time.perf_counter()
+    for _ in range(args.calculations):
+        rules.plan_for(2025)
+    print('{:<32} {:>8.2f} us'.format(
+        'plan_for(2025), memoised', (time.perf_counter() - start) / args.calculations * 1e6))
+
+    floats = list(employees(args.calculations))
+    decimals = [
+        tuple(money(v) if not isinstance(v, str) and i != 9 else v
+              for i, v in enumerate(row))
+        for row in floats
+    ]
+
+    def planned(basic, taxable, non_taxable, overtime, second_job, insurance_type,
+                premium, loan, gpsu, children):
+        return plan.calculate(basic, taxable, non_taxable, overtime, second_job,
+                              insurance_type, premium, loan, gpsu, children)
+
+    timed('legacy float inline', legacy_calculate, floats)
+    timed('compiled Decimal plan', planned, decimals)
+
+    # Same answers, to the cent
+    worst = max(
+        abs(float(planned(*d)[key]) - legacy_calculate(*f)[key])
+        for f, d in zip(floats[:2000], decimals[:2000])
+        for key in ('gross_pay', 'net_pay', 'paye_tax', 'total_annual_package')
+    )
+    print('{:<32} {:>8.2f}'.format('largest difference (GYD)', worst))
+
+
+if __name__ == '__main__':
+    main()
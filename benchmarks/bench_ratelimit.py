@@ -0,0 +1,96 @@
+# -*- encoding: utf-8 -*-
+"""
+Throughput and accuracy of the rate limiters: the previous GET + SETEX/INCR
+decorator logic versus the single-script Redis limiter and the
+shared-memory limiter.
+
+    python benchmarks/bench_ratelimit.py [--redis-url redis://localhost:6379/0]
+    python benchmarks/bench_ratelimit.py --backends memory
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import redis  # noqa: E402
+
+from apps.ratelimit import RedisRateLimiter, SharedMemoryRateLimiter  # noqa: E402
+
+
+def legacy_hit(client, key, calls, period):
+    """The check the rate_limit decorator used to do (2 round trips)."""
+    current = client.get(key)
+    if current is None:
+        client.setex(key, period, 1)
+    elif int(current) >= calls:
+        return False
+    else:
+        client.incr(key)
+    return True
+
+
+def run(label, hit, requests, threads):
+    admitted = []
+    per_thread = requests // threads
+
+    def worker():
+        count = 0
+        for _ in range(per_thread):
+            count += bool(hit())
+        admitted.append(count)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    print('{:<28} threads={:<3} {:>9.0f} checks/s  admitted={}'.format(
+        label, threads, per_thread * threads / elapsed, sum(admitted)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--redis-url', default='redis://localhost:6379/0')
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--limit', type=int, default=1000,
+                        help='calls allowed per period; admitted should not exceed it')
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 8])
+    parser.add_argument('--backends', nargs='+', default=['redis', 'memory'],
+                        choices=['redis', 'memory'])
+    args = parser.parse_args()
+    period = 3600
+
+    limiters = []
+    if 'redis' in args.backends:
+        client = redis.Redis.from_url(args.redis_url)
+        limiters.append(('script', RedisRateLimiter(client, prefix='bench')))
+    if 'memory' in args.backends:
+        path = os.path.join(tempfile.mkdtemp(), 'ratelimit')
+        limiters.append(('memory', SharedMemoryRateLimiter(path)))
+
+    for threads in args.threads:
+        if 'redis' in args.backends:
+            key = 'bench:legacy:' + uuid.uuid4().hex
+            run('legacy GET/SETEX/INCR',
+                lambda: legacy_hit(client, key, args.limit, period),
+                args.requests, threads)
+
+        for label, limiter in limiters:
+            for algorithm in ('sliding_window', 'token_bucket'):
+                key = uuid.uuid4().hex
+                run('{} {}'.format(label, algorithm),
+                    lambda: limiter.hit(key, args.limit, period, algorithm).allowed,
+                    args.requests, threads)
+
+
+if __name__ == '__main__':
+    main()
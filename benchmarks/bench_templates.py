@@ -0,0 +1,103 @@
+# -*- encoding: utf-8 -*-
+"""
+Render time per tool page: first render in a fresh worker with and without
+the Jinja bytecode cache, and warm renders with and without the cached
+layout fragments (sidenav, navigation, footer).
+
+    python benchmarks/bench_templates.py [--renders 200]
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import render_template  # noqa: E402
+
+from apps import create_app  # noqa: E402
+from apps.config import config_dict  # noqa: E402
+from apps.templating import fragments  # noqa: E402
+
+PAGES = (
+    ('home/salary-calculator.html', 'salary-calculator'),
+    ('home/vehicle-import.html', 'vehicle-import'),
+    ('home/currency-converter.html', 'currency-converter'),
+    ('home/qr-generator.html', 'qr-generator'),
+    ('home/public-ip.html', 'public-ip'),
+    ('home/about.html', 'about')
+)
+
+
+def make_app(bytecode_dir):
+    class BenchConfig(config_dict['Debug']):
+        DEBUG = False
+        TEMPLATE_PRECOMPILE = False
+        JINJA_BYTECODE_CACHE = bytecode_dir is not None
+        JINJA_BYTECODE_CACHE_DIR = bytecode_dir
+    return create_app(BenchConfig)
+
+
+def render(app, template, segment):
+    with app.test_request_context('/'):
+        return render_template(template, segment=segment)
+
+
+def first_render(bytecode_dir):
+    """Seconds per page for the first render in a new app (worker)."""
+    app = make_app(bytecode_dir)
+    fragments.clear()
+    times = {}
+    for template, segment in PAGES:
+        start = time.perf_counter()
+        render(app, template, segment)
+        times[template] = time.perf_counter() - start
+    return times
+
+
+def warm_render(app, template, segment, renders):
+    render(app, template, segment)
+    samples = []
+    for _ in range(renders):
+        start = time.perf_counter()
+        render(app, template, segment)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--renders', type=int, default=200)
+    args = parser.parse_args()
+
+    bytecode_dir = tempfile.mkdtemp()
+    try:
+        no_cache = first_render(None)
+        first_render(bytecode_dir)  # populate the bytecode cache
+        with_cache = first_render(bytecode_dir)
+
+        app = make_app(bytecode_dir)
+        fragments.enabled = False
+        uncached = {t: warm_render(app, t, s, args.renders) for t, s in PAGES}
+        fragments.enabled = True
+        cached = {t: warm_render(app, t, s, args.renders) for t, s in PAGES}
+    finally:
+        shutil.rmtree(bytecode_dir)
+
+    print('{:<30} {:>12} {:>12} {:>12} {:>12}'.format(
+        '', 'first ms', 'first ms', 'warm us', 'warm us'))
+    print('{:<30} {:>12} {:>12} {:>12} {:>12}'.format(
+        'template', 'compile', 'bytecode', 'includes', 'fragments'))
+    for template, _ in PAGES:
+        print('{:<30} {:>12.1f} {:>12.1f} {:>12.0f} {:>12.0f}'.format(
+            template,
+            no_cache[template] * 1e3, with_cache[template] * 1e3,
+            uncached[template] * 1e6, cached[template] * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -3,9 +3,94 @@
 Copyright (c) 2019 - present AppSeed.us
 """
 
-bind = '0.0.0.0:5005'
-workers = 1
+import multiprocessing
+import os
+
+# Not "config": gunicorn would read that name as its own --config setting
+from decouple import config as env
+
+# 'debug' (single worker, verbose) or 'production' (auto-sized, preloaded)
+profile = env('GUNICORN_PROFILE', default='debug')
+
+bind = env('GUNICORN_BIND', default='0.0.0.0:5005')
 accesslog = '-'
-loglevel = 'debug'
 capture_output = True
 enable_stdio_inheritance = True
+
+if profile == 'production':
+    cpu_count = multiprocessing.cpu_count()
+
+    # The speed test, DNS and IP tools spend most of their time waiting on
+    # the network, so each worker serves several requests concurrently.
+    # With gthread every open dashboard stream (/ws/dashboard) occupies a
+    # thread, so a worker keeps at most DASHBOARD_MAX_STREAMS of them and
+    # further dashboards poll; 'gevent' serves any number of streams.
+    worker_class = env('GUNICORN_WORKER_CLASS', default='gthread')
+
+    if worker_class == 'gevent':
+        # Patch before the app is preloaded so the workers inherit
+        # cooperative sockets and locks
+        from gevent import monkey
+        monkey.patch_all()
+
+        # A stream costs a greenlet, not a thread
+        os.environ.setdefault('DASHBOARD_MAX_STREAMS', '0')
+
+        workers = env('GUNICORN_WORKERS', default=cpu_count, cast=int)
+        worker_connections = env(
+            'GUNICORN_WORKER_CONNECTIONS', default=1000, cast=int)
+    else:
+        workers = env(
+            'GUNICORN_WORKERS', default=cpu_count * 2 + 1, cast=int)
+        threads = env('GUNICORN_THREADS', default=4, cast=int)
+
+    # Import the app once in the master; workers share the imported modules
+    # copy-on-write and reinitialise their connections in post_fork
+    preload_app = True
+
+    # A speed test takes well over the default 30 seconds
+    timeout = env('GUNICORN_TIMEOUT', default=120, cast=int)
+    graceful_timeout = 30
+    keepalive = 5
+
+    # Recycle workers periodically to bound memory growth
+    max_requests = env('GUNICORN_MAX_REQUESTS', default=1000, cast=int)
+    max_requests_jitter = 100
+
+    loglevel = 'info'
+else:
+    workers = 1
+    # Threads, not the sync worker: an open dashboard stream would block
+    # every other request
+    worker_class = 'gthread'
+    threads = env('GUNICORN_THREADS', default=8, cast=int)
+    loglevel = 'debug'
+
+
+# Prometheus multiprocess mode: each worker writes its metrics to files in
+# this directory and /metrics aggregates them (must be set before the app
+# is imported, i.e. in the environment of the gunicorn master)
+prometheus_dir = env('PROMETHEUS_MULTIPROC_DIR', default='')
+
+
+def on_starting(server):
+    # Drop metric files left over from a previous run
+    if prometheus_dir:
+        os.makedirs(prometheus_dir, exist_ok=True)
+        for name in os.listdir(prometheus_dir):
+            if name.endswith('.db'):
+                os.remove(os.path.join(prometheus_dir, name))
+
+
+def child_exit(server, worker):
+    if prometheus_dir:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def post_fork(server, worker):
+    # Redis connections, the SQLAlchemy pool and the scheduler thread
+    # must not be shared with the master or the other workers
+    from apps.extensions import reinit_after_fork
+
+    reinit_after_fork(server.app.wsgi())
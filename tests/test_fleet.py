@@ -0,0 +1,69 @@
+# -*- encoding: utf-8 -*-
+"""
+Vehicle import batch pricing (apps/vehicle_import/fleet.py)
+"""
+
+import json
+
+import pandas as pd
+import pytest
+
+from apps.vehicle_import import fleet
+from apps.vehicle_import.tariffs import TARIFFS_PATH, TariffError, Tariffs
+
+
+@pytest.fixture(scope='module')
+def schedule():
+    with open(TARIFFS_PATH) as f:
+        return Tariffs(json.load(f)).schedule_for()
+
+
+def _vehicles(*engine_cc, propulsion='gasoline'):
+    return pd.DataFrame({
+        'cif': 10000,
+        'vehicle_age': 'new',
+        'vehicle_type': 'car',
+        'propulsion': propulsion,
+        'engine_cc': list(engine_cc)
+    })
+
+
+def test_unknown_band_is_rejected(schedule):
+    with pytest.raises(fleet.FleetInputError, match=r'row\(s\) 3'):
+        fleet.landed_cost(_vehicles('1501-1800', '1501-1800cc'), schedule, 208.5)
+
+
+def test_cc_number_is_priced_in_its_band(schedule):
+    result = fleet.landed_cost(_vehicles('1600', '1501-1800', '3000', '3001'),
+                               schedule, 208.5)
+    assert list(result['engine_cc']) == ['1501-1800', '1501-1800', '2001-3000', '3000+']
+    assert result['total_cost'][0] == result['total_cost'][1]
+    assert result['custom_duty'][0] > 0
+
+
+def test_exempt_propulsion_ignores_engine_cc(schedule):
+    result = fleet.landed_cost(_vehicles('n/a', propulsion='electric'), schedule, 208.5)
+    assert result['total_cost'][0] == result['cif_gyd'][0]
+
+
+@pytest.mark.parametrize('cif', [0, -10000, float('nan'), float('inf'), 'inf'])
+def test_cif_must_be_a_positive_number(schedule, cif):
+    vehicles = _vehicles('1501-1800', '1501-1800')
+    vehicles['cif'] = [10000, cif]
+    with pytest.raises(fleet.FleetInputError, match=r'cif .* row\(s\) 3'):
+        fleet.landed_cost(vehicles, schedule, 208.5)
+
+
+def test_own_exchange_rate_must_be_a_positive_number(schedule):
+    vehicles = _vehicles('1501-1800')
+    vehicles['exchange_rate'] = -1
+    with pytest.raises(fleet.FleetInputError, match='exchange_rate'):
+        fleet.landed_cost(vehicles, schedule, 208.5)
+
+
+def test_single_calculation_resolves_bands_like_the_batch(schedule):
+    single = schedule.calculate(2085000.0, 208.5, 'new', 'car', 'gasoline', '1600')
+    batch = fleet.landed_cost(_vehicles('1600'), schedule, 208.5)
+    assert round(single['custom_duty'], 2) == batch['custom_duty'][0]
+    with pytest.raises(TariffError):
+        schedule.calculate(2085000.0, 208.5, 'new', 'car', 'gasoline', '1500cc')
@@ -0,0 +1,123 @@
+# -*- encoding: utf-8 -*-
+"""
+Vectorised batch payroll (apps/salary/payroll.py) against the Decimal
+PayrollPlan it mirrors (apps/salary/rules.py)
+"""
+
+import random
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+
+from apps.salary import payroll
+from apps.salary.rules import ZERO, cents, plan_for, years
+
+
+def _amount(rng, high):
+    # Whole cents, many of them landing on half cents once taxed
+    return Decimal(rng.randrange(0, high * 100)).scaleb(-2)
+
+
+def _employees(plan, count=2000, seed=18):
+    rng = random.Random(seed)
+    types = sorted(plan.insurance_premiums) + [plan.third_party_insurance]
+    return [{
+        'basic_salary': _amount(rng, 2000000),
+        'taxable_allowance_1': _amount(rng, 100000) if rng.random() < 0.5 else ZERO,
+        'non_taxable_allowance_1': _amount(rng, 50000) if rng.random() < 0.5 else ZERO,
+        'overtime_amount': _amount(rng, 200000) if rng.random() < 0.3 else ZERO,
+        'second_job_income': _amount(rng, 200000) if rng.random() < 0.2 else ZERO,
+        'insurance_type': rng.choice(types),
+        'insurance_premium': _amount(rng, 30000),
+        'loan_deduction': _amount(rng, 50000) if rng.random() < 0.2 else ZERO,
+        'gpsu_deduction': _amount(rng, 5000) if rng.random() < 0.2 else ZERO,
+        'num_children': rng.randrange(0, 5)
+    } for _ in range(count)]
+
+
+def _frame(employees):
+    return payroll.read_records([
+        {key: float(value) if isinstance(value, Decimal) else value
+         for key, value in employee.items()}
+        for employee in employees
+    ])
+
+
+def _decimal_inputs(employee):
+    return {
+        'taxable_allowances': employee['taxable_allowance_1'],
+        'non_taxable_allowances': employee['non_taxable_allowance_1'],
+        'overtime': employee['overtime_amount'],
+        'second_job': employee['second_job_income'],
+        'insurance_type': employee['insurance_type'],
+        'insurance_premium': employee['insurance_premium'],
+        'loan_deduction': employee['loan_deduction'],
+        'gpsu_deduction': employee['gpsu_deduction'],
+        'children': employee['num_children']
+    }
+
+
+def _as_cents(value):
+    return int(round(float(value) * 100))
+
+
+@pytest.fixture(scope='module', params=years())
+def plan(request):
+    return plan_for(request.param)
+
+
+def test_compute_matches_calculate_to_the_cent(plan):
+    employees = _employees(plan)
+    result = payroll.compute(_frame(employees), plan)
+
+    for row, employee in zip(result.itertuples(index=False), employees):
+        expected = plan.calculate(employee['basic_salary'], **_decimal_inputs(employee))
+        expected['basic_salary'] = employee['basic_salary']
+        expected['loan_deduction'] = employee['loan_deduction']
+        expected['gpsu_deduction'] = employee['gpsu_deduction']
+        for column in payroll.OUTPUT_COLUMNS:
+            assert _as_cents(getattr(row, column)) == _as_cents(expected[column]), \
+                (column, employee)
+
+
+def test_solve_basic_matches_solve_basic_salary(plan):
+    employees = _employees(plan, count=200, seed=19)
+    targets = [_amount(random.Random(i), 1500000) for i in range(len(employees))]
+    frame = _frame(employees)
+    frame['target_net_pay'] = [float(target) for target in targets]
+    result = payroll.solve_basic(frame, plan)
+
+    for row, employee, target in zip(result.itertuples(index=False), employees, targets):
+        basic, expected = plan.solve_basic_salary(target, **_decimal_inputs(employee))
+        assert _as_cents(row.basic_salary) == _as_cents(basic), employee
+        assert _as_cents(row.net_pay) == _as_cents(expected['net_pay']), employee
+
+
+def test_increase_sweep_matches_the_decimal_building_blocks(plan):
+    salary = Decimal('187654.33')
+    percentages = [Decimal(p).scaleb(-1) for p in range(0, 501, 7)]
+    children, taxable = (0, 1, 3), (True, False)
+    combinations, curves = payroll.increase_sweep(
+        plan, float(salary), [float(p) for p in percentages], children, taxable)
+
+    for i, (kids, is_taxable) in enumerate(combinations):
+        for j, percentage in enumerate(percentages):
+            gross = salary + salary * percentage / 100
+            nis = plan.nis(gross, gross)
+            taxed_pay = gross if is_taxable else salary
+            paye = plan.paye(max(ZERO, taxed_pay - plan.allowance(kids) - nis))
+            net = gross - nis - paye
+            package = (net + plan.gratuity(gross)) * 12 + gross
+            for name, expected in (('new_nis', nis), ('new_paye', paye),
+                                   ('new_net_pay', net),
+                                   ('new_total_annual_package', package)):
+                assert _as_cents(curves[name][i, j]) == _as_cents(cents(expected)), \
+                    (name, kids, is_taxable, percentage)
+
+
+def test_half_cents_round_up_like_decimal():
+    values = [Decimal('0.005'), Decimal('2.675'), Decimal('1234567.125'),
+              Decimal('-0.005'), Decimal('-2.675')]
+    rounded = payroll._cents(pd.Series([float(v) for v in values]).to_numpy())
+    assert [_as_cents(v) for v in rounded] == [_as_cents(cents(v)) for v in values]